@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Per-file cost of reading a notebook's frontmatter, title and summary.
+
+"before" is the approach scripts/generate_notebook_index.py used until the
+streaming scanner: read the whole file, splitlines() it, slice off the body
+and walk it again for the title and the summary. "after" is
+scan_notebook_head() over the open file, which stops reading once it has
+everything, and over the text in memory sliced by iter_lines(), as
+parse_notebook() uses it (it needs the whole text for search terms anyway).
+Synthetic notebooks of each size share the same frontmatter and opening
+paragraph, so only the length of the rest differs.
+
+    python3 benchmarks/bench_notebook_parse.py --sizes 4,64,512 --files 200
+    python3 benchmarks/bench_notebook_parse.py --output bench_parse.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_notebook_index  # noqa: E402
+from generate_notebook_index import derive_date, iter_lines, parse_frontmatter, parse_tags, scan_notebook_head  # noqa: E402
+
+
+def baseline_title(meta: dict[str, Any], content_lines: list[str], filename: str) -> str:
+    title = str(meta.get("title") or "").strip()
+    if title:
+        return title
+    for line in content_lines:
+        stripped = line.strip()
+        if stripped.startswith("# "):
+            return stripped[2:].strip()
+    return filename.replace(".md", "").replace("-", " ").strip() or "(untitled)"
+
+
+def baseline_summary(content_lines: list[str]) -> str:
+    in_code = False
+    parts: list[str] = []
+    for line in content_lines:
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_code = not in_code
+            continue
+        if in_code:
+            continue
+        if not stripped:
+            if parts:
+                break
+            continue
+        if stripped.startswith("#") or stripped.startswith(">"):
+            continue
+        cleaned = re.sub(r"^[-*]\s+", "", stripped)
+        cleaned = re.sub(r"^\d+\.\s+", "", cleaned)
+        cleaned = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", cleaned)
+        parts.append(cleaned)
+        if len(" ".join(parts)) > 220:
+            break
+    summary = re.sub(r"\s+", " ", " ".join(parts)).strip()
+    return summary[:177].rstrip() + "..." if len(summary) > 180 else summary
+
+
+def head_before(path: Path) -> tuple[str, str, list[str], str]:
+    meta, content_lines = parse_frontmatter(path.read_text(encoding="utf-8"))
+    summary = str(meta.get("summary") or "").strip() or baseline_summary(content_lines)
+    return baseline_title(meta, content_lines, path.name), derive_date(meta, path.name), parse_tags(meta.get("tags")), summary
+
+
+def head_after_file(path: Path) -> tuple[str, str, list[str], str]:
+    with path.open(encoding="utf-8", newline="") as f:
+        meta, heading, summary, _ = scan_notebook_head(f)
+    summary = str(meta.get("summary") or "").strip() or summary
+    title = generate_notebook_index.derive_title(meta, heading, path.name)
+    return title, derive_date(meta, path.name), parse_tags(meta.get("tags")), summary
+
+
+def head_after_text(path: Path) -> tuple[str, str, list[str], str]:
+    meta, heading, summary, _ = scan_notebook_head(iter_lines(path.read_text(encoding="utf-8")))
+    summary = str(meta.get("summary") or "").strip() or summary
+    title = generate_notebook_index.derive_title(meta, heading, path.name)
+    return title, derive_date(meta, path.name), parse_tags(meta.get("tags")), summary
+
+
+VARIANTS: dict[str, Callable[[Path], tuple[str, str, list[str], str]]] = {
+    "before": head_before,
+    "after_file": head_after_file,
+    "after_text": head_after_text,
+}
+
+
+def write_corpus(directory: Path, count: int, size_kb: int, rng: random.Random) -> list[Path]:
+    words = ["loewner", "energy", "curve", "welding", "agent", "market", "model", "proof", "lemma", "stable"]
+    paths = []
+    for i in range(count):
+        lines = [
+            "---",
+            f"title: Synthetic note {i}",
+            f"date: 2026-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "tags: [bench, synthetic]",
+            "---",
+            "",
+            f"# Synthetic note {i}",
+            "",
+            " ".join(rng.choice(words) for _ in range(60)),
+            "",
+        ]
+        text = "\n".join(lines)
+        while len(text) < size_kb * 1024:
+            text += "\n" + " ".join(rng.choice(words) for _ in range(14)) + "\n"
+        path = directory / f"2026-01-01-note-{i}.md"
+        path.write_text(text, encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def time_variant(fn: Callable[[Path], Any], paths: list[Path], repeat: int) -> tuple[float, int]:
+    """Best-of-`repeat` microseconds per file and the peak traced allocation of one file."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path in paths:
+            fn(path)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(paths[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best / len(paths) * 1e6, peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark notebook frontmatter/summary parsing, before and after streaming.")
+    parser.add_argument("--sizes", default="4,64,512", help="Comma-separated notebook sizes in KB")
+    parser.add_argument("--files", type=int, default=200, help="Notebooks per size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per variant; the best is reported")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'size KB':>7} " + " ".join(f"{name + ' us':>14} {name + ' peak KB':>18}" for name in VARIANTS))
+    cases = []
+    for size_kb in [int(x) for x in args.sizes.split(",") if x.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_corpus(Path(tmp), args.files, size_kb, rng)
+            results = {name: head_before(paths[0]) == fn(paths[0]) for name, fn in VARIANTS.items()}
+            if not all(results.values()):
+                raise SystemExit(f"variants disagree at {size_kb} KB: {results}")
+            case: dict[str, Any] = {"size_kb": size_kb, "files": args.files}
+            for name, fn in VARIANTS.items():
+                per_file_us, peak = time_variant(fn, paths, args.repeat)
+                case[name] = {"per_file_us": round(per_file_us, 2), "peak_bytes": peak}
+        cases.append(case)
+        print(
+            f"{size_kb:>7} "
+            + " ".join(f"{case[name]['per_file_us']:>14.1f} {case[name]['peak_bytes'] / 1024:>18.1f}" for name in VARIANTS)
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"cases": cases}, indent=4) + "\n", encoding="utf-8")
+        print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Build-time and size benchmark for the notebook full-text search index.
+
+Each case writes a synthetic notebook archive (Zipf-distributed vocabulary,
+frontmatter, headings and links) into a temp directory, points
+scripts/generate_notebook_index.py at it, and times the parse stage (which
+counts terms) and the search index stage separately. It reports the index
+size, compact and gzip, relative to the Markdown corpus, plus the number of
+shards and the largest shard a query could have to fetch.
+
+    python3 benchmarks/bench_search_index.py --notebooks 100,1000,5000 --words 1500
+    python3 benchmarks/bench_search_index.py --notebooks 1000 --output bench_search.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_notebook_index  # noqa: E402
+
+
+def synthetic_vocabulary(size: int, rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words: set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 11))))
+    return sorted(words)
+
+
+def write_corpus(notebooks_dir: Path, count: int, words: int, vocabulary: int, seed: int) -> int:
+    """Write `count` notebooks of about `words` words each; return the corpus size in bytes."""
+    rng = random.Random(seed)
+    vocab = synthetic_vocabulary(vocabulary, rng)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    notebooks_dir.mkdir(parents=True)
+    total = 0
+    for i in range(count):
+        body_words = rng.choices(vocab, weights=weights, k=words)
+        paragraphs = [" ".join(body_words[j : j + 90]) for j in range(0, len(body_words), 90)]
+        text = (
+            f"---\ntitle: Note {i} {' '.join(body_words[:3])}\n"
+            f"date: {2000 + i // 365:04d}-{1 + i % 12:02d}-{1 + i % 28:02d}\n"
+            f"tags: [{body_words[3]}, {body_words[4]}]\n---\n\n"
+            f"# Note {i}\n\n" + "\n\n".join(paragraphs) + f"\n\nSee [a paper](doi:10.1000/{i}).\n"
+        )
+        path = notebooks_dir / f"{2000 + i // 365:04d}-{1 + i % 12:02d}-{1 + i % 28:02d}-note-{i}.md"
+        path.write_text(text, encoding="utf-8")
+        total += len(text.encode("utf-8"))
+    return total
+
+
+def run_case(count: int, args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        corpus_bytes = write_corpus(root / "notebooks", count, args.words, args.vocabulary, args.seed)
+
+        generate_notebook_index.ROOT = root
+        generate_notebook_index.NOTEBOOKS_DIR = root / "notebooks"
+        generate_notebook_index.SEARCH_DIR = root / "notebooks" / "search"
+
+        cache: dict[str, dict[str, Any]] = {}
+        started = time.perf_counter()
+        generate_notebook_index.scan_notebooks(cache, jobs=args.jobs)
+        parse_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        generate_notebook_index.write_search_index(cache)
+        index_s = time.perf_counter() - started
+
+        shard_sizes = []
+        gzip_bytes = 0
+        manifest_bytes = 0
+        for path in generate_notebook_index.SEARCH_DIR.glob("*.json"):
+            content = path.read_bytes()
+            gzip_bytes += len(gzip.compress(content, compresslevel=9, mtime=0))
+            if path.name == generate_notebook_index.SEARCH_MANIFEST_NAME:
+                manifest_bytes = len(content)
+            else:
+                shard_sizes.append(len(content))
+        index_bytes = manifest_bytes + sum(shard_sizes)
+
+    return {
+        "notebooks": count,
+        "words": args.words,
+        "vocabulary": args.vocabulary,
+        "corpus_bytes": corpus_bytes,
+        "parse_s": round(parse_s, 4),
+        "index_s": round(index_s, 4),
+        "index_bytes": index_bytes,
+        "index_gzip_bytes": gzip_bytes,
+        "manifest_bytes": manifest_bytes,
+        "shards": len(shard_sizes),
+        "largest_shard_bytes": max(shard_sizes, default=0),
+        "index_ratio": round(index_bytes / corpus_bytes, 4) if corpus_bytes else 0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the notebook search index build.")
+    parser.add_argument("--notebooks", default="100,1000,5000", help="Comma-separated archive sizes")
+    parser.add_argument("--words", type=int, default=1500, help="Words per notebook")
+    parser.add_argument("--vocabulary", type=int, default=20000, help="Distinct words in the synthetic language")
+    parser.add_argument("--jobs", type=int, default=1, help="Parse workers, as in generate_notebook_index.py --jobs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print(
+        f"{'notebooks':>9} {'corpus MB':>10} {'parse s':>8} {'index s':>8} {'index MB':>9} "
+        f"{'gzip MB':>8} {'ratio':>6} {'shards':>6} {'max shard KB':>12}"
+    )
+    cases = []
+    for count in [int(x) for x in args.notebooks.split(",") if x.strip()]:
+        case = run_case(count, args)
+        cases.append(case)
+        print(
+            f"{count:>9} {case['corpus_bytes'] / 1e6:>10.2f} {case['parse_s']:>8.3f} {case['index_s']:>8.3f} "
+            f"{case['index_bytes'] / 1e6:>9.2f} {case['index_gzip_bytes'] / 1e6:>8.2f} {case['index_ratio']:>6.2f} "
+            f"{case['shards']:>6} {case['largest_shard_bytes'] / 1e3:>12.1f}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"cases": cases}, indent=4) + "\n", encoding="utf-8")
+        print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
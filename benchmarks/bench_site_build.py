@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Timing and peak-memory suite for the site build scripts.
+
+Generates synthetic inputs in a temp directory: an archive of notebooks
+(some citing library items), a Zotero snapshot in the legacy single-file
+layout, a BibTeX file and a thesis-sized .tex chapter. It then runs each
+stage on them:
+
+    build_index_entries        notebook scan and parse, no build cache
+    write_notebooks_page_list  notebooks.html list (a copy of the real page)
+    write_sitemap              sitemap.xml
+    write_rendered_notebooks   pre-rendered HTML, references from the snapshot
+    convert_tex_to_markdown    scripts/tmp_convert_intro_tex_to_md.py
+    parse_bibtex_entries       scripts/tmp_append_refs_from_bib.py
+
+Wall time is the best of --repeat runs. Peak memory comes from one more run
+under tracemalloc, so tracing does not skew the times. --profile DIR writes
+a cProfile dump per stage (read it with python3 -m pstats). Results go to
+--output as JSON; pass an earlier file as --baseline to print the ratios.
+
+    python3 benchmarks/bench_site_build.py --output bench_site.json
+    python3 benchmarks/bench_site_build.py --notebooks 2000 --stages build_index_entries,write_sitemap
+    python3 benchmarks/bench_site_build.py --baseline bench_site.json --profile /tmp/profiles
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import json
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+import generate_notebook_index  # noqa: E402
+from tmp_append_refs_from_bib import parse_bibtex_entries  # noqa: E402
+from tmp_convert_intro_tex_to_md import convert_tex_to_markdown  # noqa: E402
+
+
+WORDS = (
+    "loewner energy curve welding conformal map domain boundary agent market model proof lemma "
+    "stable coin liquidity risk screening client bank theorem estimate driving function chord "
+    "quasiconformal schwarzian residue optimization geodesic sphere equator measure"
+).split()
+SURNAMES = ["Wang", "Rohde", "Marshall", "Bonk", "Sung", "Takhtajan", "Teo", "Lawler", "Schramm", "Werner"]
+GIVEN = ["Yilin", "Steffen", "Donald", "Mario", "Jinwoo", "Leon", "Gregory", "Oded", "Wendelin"]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def zotero_key(i: int) -> str:
+    return f"B{i:07d}"
+
+
+def write_zotero_snapshot(path: Path, items: int, rng: random.Random) -> None:
+    collections = [f"C{i:07d}" for i in range(max(1, items // 500))]
+    collection_items: dict[str, list[dict[str, Any]]] = {key: [] for key in collections}
+    for i in range(items):
+        author = f"{rng.choice(SURNAMES)}, {rng.choice(GIVEN)[0]}."
+        title = sentence(rng, 8)
+        doi = f"10.{1000 + i % 9000}/bench.{i}"
+        item = {
+            "key": zotero_key(i),
+            "version": 1,
+            "data": {"title": title, "DOI": doi, "url": f"https://example.org/paper/{i}", "date": str(1990 + i % 35)},
+            "bib": (
+                '<div class="csl-bib-body" style="line-height: 2; padding-left: 1em; text-indent:-1em;">\n'
+                f'  <div class="csl-entry">{author} ({1990 + i % 35}). {title} <i>Journal {i % 50}</i>. '
+                f'<a href="https://doi.org/{doi}">https://doi.org/{doi}</a></div>\n</div>'
+            ),
+        }
+        collection_items[collections[i % len(collections)]].append(item)
+    snapshot = {
+        "source": {"group_id": "1", "collection_key": "ROOTCOLL", "style": "apa"},
+        "collections": [{"key": key, "name": f"Collection {key}", "parentCollection": "ROOTCOLL"} for key in collections],
+        "collection_items": collection_items,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(snapshot), encoding="utf-8")
+
+
+def write_notebooks(notebooks_dir: Path, count: int, size_kb: int, zotero_items: int, rng: random.Random) -> None:
+    notebooks_dir.mkdir(parents=True)
+    for i in range(count):
+        day = f"{2000 + i // 336:04d}-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}"
+        parts = [
+            "---",
+            f"title: {sentence(rng, 5)[:-1]}",
+            f"date: {day}",
+            f"tags: [{rng.choice(WORDS)}, {rng.choice(WORDS)}]",
+            f"collection: {rng.choice(['Mathematics', 'Finance', 'Agents'])}",
+            "---",
+            "",
+            f"# Notebook {i}",
+            "",
+        ]
+        text = "\n".join(parts)
+        while len(text) < size_kb * 1024:
+            block = rng.random()
+            if block < 0.1:
+                text += f"\n## {sentence(rng, 4)[:-1]}\n"
+            elif block < 0.2:
+                text += "\n" + "\n".join(f"- {sentence(rng, 9)}" for _ in range(4)) + "\n"
+            elif block < 0.25:
+                text += "\n\\begin{align}\nI^{L}(\\gamma) = \\int_0^T \\dot{W}_t^2 \\, dt\n\\end{align}\n"
+            elif block < 0.3:
+                text += "\n```python\n" + "\n".join(f"x_{j} = {j} * y" for j in range(6)) + "\n```\n"
+            else:
+                paragraph = " ".join(sentence(rng, rng.randint(8, 20)) for _ in range(4))
+                if zotero_items and rng.random() < 0.3:
+                    j = rng.randrange(zotero_items)
+                    cite = f"[{rng.choice(SURNAMES)}](zotero:{zotero_key(j)})" if j % 2 else f"[doi](doi:10.{1000 + j % 9000}/bench.{j})"
+                    paragraph += f" See {cite} and $x_{{{j % 10}}} + y$."
+                text += "\n" + paragraph + "\n"
+        (notebooks_dir / f"{day}-note-{i}.md").write_text(text, encoding="utf-8")
+
+
+def write_bibtex(path: Path, entries: int, rng: random.Random) -> None:
+    chunks = []
+    for i in range(entries):
+        authors = " and ".join(f"{rng.choice(SURNAMES)}, {rng.choice(GIVEN)}" for _ in range(rng.randint(1, 4)))
+        kind = rng.choice(["article", "book", "inproceedings", "misc"])
+        fields = [
+            f"  author = {{{authors}}}",
+            f"  title = {{{{{sentence(rng, 7)[:-1]}}} with {{$\\mathbb{{H}}$}} braces}}",
+            f'  journal = "Journal of {rng.choice(WORDS).title()}"',
+            f"  year = {1950 + i % 75}",
+            f"  doi = {{10.{1000 + i % 9000}/bib.{i}}}",
+            f"  url = {{https://example.org/bib/{i}}}",
+        ]
+        chunks.append(f"@{kind}{{key{i},\n" + ",\n".join(fields) + "\n}\n")
+    path.write_text("\n".join(chunks), encoding="utf-8")
+
+
+def write_thesis_tex(path: Path, size_kb: int, rng: random.Random) -> None:
+    parts = []
+    chapter = theorem = equation = 0
+    text_len = 0
+    while text_len < size_kb * 1024:
+        roll = rng.random()
+        if roll < 0.02 or chapter == 0:
+            chapter += 1
+            part = f"\\chapter{{{sentence(rng, 3)[:-1]}}}\\label{{ch:{chapter}}}\n"
+        elif roll < 0.08:
+            part = f"\\section{{{sentence(rng, 4)[:-1]}}}\n"
+        elif roll < 0.14:
+            theorem += 1
+            part = (
+                "\\begin{theorem}\n"
+                f"    \\label{{thm:{theorem}}}\n"
+                f"    {sentence(rng, 18)} Let $z_{{k}} \\in \\mathbb{{C}}$ as in \\eqref{{eq:{max(1, equation)}}}.\n"
+                "\\end{theorem}\n"
+            )
+        elif roll < 0.24:
+            equation += 1
+            part = (
+                "\\begin{align}\n"
+                f"    \\label{{eq:{equation}}}\n"
+                "    I^{L}(\\gamma) &= \\frac{1}{2} \\int_{0}^{\\infty} \\dot{W}_{t}^{2} \\, dt \\\\\n"
+                "    &= \\sum_{k=1}^{n} \\text{Res}(\\mathcal{S}[F], z_{k})\n"
+                "\\end{align}\n"
+            )
+        elif roll < 0.26:
+            part = f"\\begin{{comment}}\n{sentence(rng, 30)}\n\\end{{comment}}\n"
+        else:
+            refs = f" By Theorem~\\ref{{thm:{max(1, theorem)}}} and \\cref{{ch:{chapter}}}," if theorem else ""
+            part = (
+                f"{sentence(rng, 25)}~\\cite{{key{rng.randrange(10000)}}}{refs} \\emph{{{rng.choice(WORDS)}}} "
+                f"and \\textbf{{{rng.choice(WORDS)}}} hold. % a trailing comment\n{sentence(rng, 30)}\n"
+            )
+        parts.append(part + "\n")
+        text_len += len(part) + 1
+    path.write_text("".join(parts), encoding="utf-8")
+
+
+def point_generator_at(root: Path) -> None:
+    gni = generate_notebook_index
+    gni.ROOT = root
+    gni.NOTEBOOKS_DIR = root / "notebooks"
+    gni.RENDERED_DIR = root / "notebooks" / "rendered"
+    gni.ZOTERO_DIR = root / "zotero"
+    gni.ZOTERO_SNAPSHOT_PATH = root / "zotero" / "library-items.json"
+    gni.NOTEBOOKS_HTML_PATH = root / "notebooks.html"
+    gni.SITEMAP_PATH = root / "sitemap.xml"
+
+
+def build_stages(root: Path, args: argparse.Namespace) -> dict[str, tuple[Callable[[], Any], Callable[[], Any]]]:
+    """Stage name -> (setup, run); setup returns the state run needs and is not timed."""
+    gni = generate_notebook_index
+    tex = (root / "thesis.tex").read_text(encoding="utf-8")
+    bib = (root / "refs.bib").read_text(encoding="utf-8")
+    entries = gni.build_index_entries()
+    records: dict[str, dict[str, Any]] = {}
+    gni.scan_notebooks(records)
+
+    def fresh_records() -> dict[str, dict[str, Any]]:
+        # Drop render fingerprints and outputs so every run renders everything.
+        shutil.rmtree(gni.RENDERED_DIR, ignore_errors=True)
+        return {rel: {k: v for k, v in record.items() if k != "rendered"} for rel, record in records.items()}
+
+    stages: dict[str, tuple[Callable[[], Any], Callable[[], Any]]] = {
+        "build_index_entries": (lambda: None, lambda _: gni.build_index_entries()),
+        "write_notebooks_page_list": (
+            lambda: shutil.copyfile(ROOT / "notebooks.html", gni.NOTEBOOKS_HTML_PATH),
+            lambda _: gni.write_notebooks_page_list(entries),
+        ),
+        "write_sitemap": (lambda: gni.SITEMAP_PATH.unlink(missing_ok=True), lambda _: gni.write_sitemap(entries)),
+        "write_rendered_notebooks": (fresh_records, gni.write_rendered_notebooks),
+        "convert_tex_to_markdown": (lambda: None, lambda _: convert_tex_to_markdown(tex)),
+        "parse_bibtex_entries": (lambda: None, lambda _: parse_bibtex_entries(bib)),
+    }
+    return stages
+
+
+def run_stage(name: str, setup: Callable[[], Any], run: Callable[[Any], Any], args: argparse.Namespace) -> dict[str, Any]:
+    times = []
+    for _ in range(args.repeat):
+        state = setup()
+        started = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - started)
+
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result: dict[str, Any] = {
+        "best_s": round(min(times), 5),
+        "median_s": round(sorted(times)[len(times) // 2], 5),
+        "peak_mem_bytes": peak,
+    }
+    if args.profile:
+        profile_dir = Path(args.profile)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        state = setup()
+        profiler = cProfile.Profile()
+        profiler.runcall(run, state)
+        profile_path = profile_dir / f"{name}.prof"
+        profiler.dump_stats(str(profile_path))
+        result["profile"] = str(profile_path)
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the site build stages on synthetic inputs.")
+    parser.add_argument("--notebooks", type=int, default=500, help="Synthetic notebooks")
+    parser.add_argument("--notebook-kb", type=int, default=8, help="Approximate size of each notebook")
+    parser.add_argument("--zotero-items", type=int, default=2000, help="Items in the synthetic Zotero snapshot")
+    parser.add_argument("--bib-entries", type=int, default=10000, help="Entries in the synthetic BibTeX file")
+    parser.add_argument("--tex-kb", type=int, default=400, help="Approximate size of the synthetic thesis .tex")
+    parser.add_argument("--stages", help="Comma-separated subset of stages to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; best and median are reported")
+    parser.add_argument("--profile", metavar="DIR", help="Also write a cProfile dump per stage into DIR")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Earlier --output file to compare best times against")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        started = time.perf_counter()
+        write_zotero_snapshot(root / "zotero" / "library-items.json", args.zotero_items, rng)
+        write_notebooks(root / "notebooks", args.notebooks, args.notebook_kb, args.zotero_items, rng)
+        write_bibtex(root / "refs.bib", args.bib_entries, rng)
+        write_thesis_tex(root / "thesis.tex", args.tex_kb, rng)
+        point_generator_at(root)
+        print(f"generated inputs in {time.perf_counter() - started:.2f} s")
+
+        stages = build_stages(root, args)
+        selected = [s.strip() for s in args.stages.split(",") if s.strip()] if args.stages else list(stages)
+        unknown = [s for s in selected if s not in stages]
+        if unknown:
+            parser.error(f"unknown stage(s) {', '.join(unknown)}; choose from {', '.join(stages)}")
+
+        baseline: dict[str, Any] = {}
+        if args.baseline:
+            baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")).get("stages", {})
+
+        print(f"{'stage':<27} {'best s':>9} {'median s':>9} {'peak MB':>8}{'  vs baseline' if baseline else ''}")
+        results: dict[str, Any] = {}
+        for name in selected:
+            setup, run = stages[name]
+            result = run_stage(name, setup, run, args)
+            results[name] = result
+            line = f"{name:<27} {result['best_s']:>9.4f} {result['median_s']:>9.4f} {result['peak_mem_bytes'] / 1e6:>8.1f}"
+            previous = baseline.get(name, {}).get("best_s")
+            if previous:
+                line += f"  {result['best_s'] / previous:>8.2f}x"
+            print(line)
+
+    if args.output:
+        payload = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "params": {
+                k: getattr(args, k) for k in ("notebooks", "notebook_kb", "zotero_items", "bib_entries", "tex_kb", "repeat", "seed")
+            },
+            "stages": results,
+        }
+        Path(args.output).write_text(json.dumps(payload, indent=4) + "\n", encoding="utf-8")
+        print(f"wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
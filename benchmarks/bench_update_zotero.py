@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for scripts/update_zotero.py against the local Zotero stand-in.
+
+Each case starts benchmarks/zotero_stub_server.py in-process with a synthetic
+library, runs update_zotero.main() against it into a temp directory, and
+reports requests, bytes served, wall time and peak traced memory. With
+--incremental, each case also measures a no-change run and a run after
+--touch items were edited; with --warm-cache, a second full sync that
+reuses the page cache the first one filled, as a restarted run would. With
+--style-change, runs that add and then drop an extra citation style on an
+unchanged library also check that bib/mla.json is written and removed.
+
+    python3 benchmarks/bench_update_zotero.py --items 100,1000,10000 --latency-ms 20
+    python3 benchmarks/bench_update_zotero.py --items 1000 --rate-429 0.05 --output bench_output.json
+
+Peak memory is measured with tracemalloc and includes the stub server, which
+runs in the same process; use --no-memory for undisturbed wall times.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import update_zotero  # noqa: E402
+from zotero_stub_server import GROUP_ID, ROOT_COLLECTION_KEY, SyntheticLibrary, ZoteroStubServer  # noqa: E402
+
+
+@contextlib.contextmanager
+def patched_env(values: dict[str, str | None]) -> Iterator[None]:
+    saved = {k: os.environ.get(k) for k in values}
+    try:
+        for k, v in values.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def run_update() -> int:
+    # No command-line flags: the benchmark's own arguments are not meant for the updater.
+    return update_zotero.main([])
+
+
+def measure(server: ZoteroStubServer, fn: Callable[[], int], track_memory: bool) -> dict[str, Any]:
+    before = server.stats.as_dict()
+    log = io.StringIO()
+    if track_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        exit_code = fn()
+    wall_s = time.perf_counter() - started
+    peak = None
+    if track_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    after = server.stats.as_dict()
+
+    result: dict[str, Any] = {
+        "exit_code": exit_code,
+        "wall_s": round(wall_s, 4),
+        "requests": after["requests"] - before["requests"],
+        "bytes": after["bytes_sent"] - before["bytes_sent"],
+        "throttled": after["throttled"] - before["throttled"],
+        "peak_mem_bytes": peak,
+    }
+    if exit_code != 0:
+        result["log"] = log.getvalue()[-2000:]
+    return result
+
+
+def run_case(num_items: int, args: argparse.Namespace) -> dict[str, Any]:
+    library = SyntheticLibrary(num_items, args.collections, nested=not args.flat)
+    server = ZoteroStubServer(library, latency_ms=args.latency_ms, rate_429=args.rate_429, retry_after_s=args.retry_after)
+    server.start_background()
+
+    # Point the updater at the stand-in with fresh connections and limiter state.
+    update_zotero.API_BASE = server.base_url
+    update_zotero.HTTP_POOL = update_zotero.ConnectionPool()
+    update_zotero.RATE_LIMITER = update_zotero.RateLimiter(args.rate_limit)
+
+    case: dict[str, Any] = {
+        "items": num_items,
+        "collections": args.collections,
+        "concurrency": args.concurrency,
+        "fetch_mode": args.fetch_mode,
+        "latency_ms": args.latency_ms,
+        "rate_429": args.rate_429,
+    }
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            output_path = Path(tmp) / "library-items.json"
+            update_zotero.PAGE_CACHE = update_zotero.PageCache(Path(tmp) / "cache", 1 << 30)
+            env: dict[str, str | None] = {
+                "ZOTERO_GROUP_ID": GROUP_ID,
+                "ZOTERO_COLLECTION_KEY": ROOT_COLLECTION_KEY,
+                "ZOTERO_STYLE": "apa",
+                "ZOTERO_OUTPUT_PATH": str(output_path),
+                "ZOTERO_CONCURRENCY": str(args.concurrency),
+                "ZOTERO_FETCH_MODE": args.fetch_mode,
+                "ZOTERO_FULL_SYNC": "1",
+            }
+            with patched_env(env):
+                case["full"] = measure(server, run_update, not args.no_memory)
+            case["output_bytes"] = output_path.stat().st_size if output_path.exists() else 0
+
+            if args.warm_cache:
+                with patched_env(env):
+                    case["warm_cache"] = measure(server, run_update, not args.no_memory)
+
+            if args.incremental:
+                with patched_env({**env, "ZOTERO_FULL_SYNC": None}):
+                    case["no_change"] = measure(server, run_update, not args.no_memory)
+                    library.touch(args.touch, delete=max(1, args.touch // 10))
+                    case["incremental"] = measure(server, run_update, not args.no_memory)
+
+            if args.style_change:
+                # A changed style list alone must rebuild bib/, even with no library changes.
+                bib_path = output_path.parent / update_zotero.BIB_DIRNAME / "mla.json"
+                with patched_env({**env, "ZOTERO_FULL_SYNC": None, "ZOTERO_EXTRA_STYLES": "mla"}):
+                    case["style_added"] = measure(server, run_update, not args.no_memory)
+                    case["style_added"]["bib_ok"] = bib_path.exists()
+                with patched_env({**env, "ZOTERO_FULL_SYNC": None, "ZOTERO_EXTRA_STYLES": None}):
+                    case["style_removed"] = measure(server, run_update, not args.no_memory)
+                    case["style_removed"]["bib_ok"] = not bib_path.exists()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return case
+
+
+def format_row(label: str, run: dict[str, Any]) -> str:
+    peak = run.get("peak_mem_bytes")
+    peak_text = f"{peak / 1e6:8.1f}" if isinstance(peak, int) else f"{'-':>8}"
+    return (
+        f"{label:<22} {run['wall_s']:>9.3f} {run['requests']:>9} {run['bytes'] / 1e6:>10.2f} "
+        f"{run['throttled']:>9} {peak_text}  exit={run['exit_code']}"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark update_zotero.py against a local Zotero API stand-in.")
+    parser.add_argument("--items", default="100,1000,10000", help="Comma-separated library sizes (100 to 100000)")
+    parser.add_argument("--collections", type=int, default=20)
+    parser.add_argument("--flat", action="store_true", help="No nested subcollections")
+    parser.add_argument("--concurrency", type=int, default=update_zotero.DEFAULT_CONCURRENCY)
+    parser.add_argument("--fetch-mode", choices=sorted(update_zotero.FETCH_MODES), default="collections")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stand-in latency per request")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After seconds on injected 429s")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Client token-bucket rate (0 = unlimited)")
+    parser.add_argument("--incremental", action="store_true", help="Also measure no-change and incremental runs")
+    parser.add_argument("--touch", type=int, default=10, help="Items edited before the incremental run")
+    parser.add_argument("--warm-cache", action="store_true", help="Also measure a full sync with a warm page cache")
+    parser.add_argument(
+        "--style-change",
+        action="store_true",
+        help="Also run with an extra style added and then removed, and check bib/ follows",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc peak-memory tracking")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    sizes = [int(x) for x in args.items.split(",") if x.strip()]
+    print(f"{'case':<22} {'wall s':>9} {'requests':>9} {'MB':>10} {'429s':>9} {'peak MB':>8}")
+
+    cases = []
+    for size in sizes:
+        case = run_case(size, args)
+        cases.append(case)
+        for run_name in ("full", "warm_cache", "no_change", "incremental", "style_added", "style_removed"):
+            if run_name in case:
+                print(format_row(f"{size} items {run_name}", case[run_name]))
+                if case[run_name].get("bib_ok") is False:
+                    print(f"  {run_name}: bib/mla.json not updated for the style list", file=sys.stderr)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"cases": cases}, indent=4) + "\n", encoding="utf-8")
+        print(f"wrote {args.output}")
+    bib_ok = all(c[name].get("bib_ok", True) for c in cases for name in ("style_added", "style_removed") if name in c)
+    return 0 if bib_ok and all(c["full"]["exit_code"] == 0 for c in cases) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
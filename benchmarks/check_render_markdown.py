@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Fixtures for scripts/render_markdown.py: Markdown inputs next to the HTML
+marked (with its GFM defaults, as notebook-viewer.html uses it) renders for
+them. notebook-viewer.html shows the pre-rendered fragments instead of
+running marked, so any difference here is visible on the site. Whitespace
+between tags is ignored when comparing.
+
+    python3 benchmarks/check_render_markdown.py
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from render_markdown import is_supported, render_markdown  # noqa: E402
+
+
+FIXTURES: list[tuple[str, str, str]] = [
+    ("strong em", "***bold italic***", "<p><em><strong>bold italic</strong></em></p>"),
+    ("strong em underscores", "___bold italic___", "<p><em><strong>bold italic</strong></em></p>"),
+    ("strong then em", "***a** b*", "<p><em><strong>a</strong> b</em></p>"),
+    ("em then strong", "*a **b***", "<p><em>a <strong>b</strong></em></p>"),
+    ("em inside strong", "***a* b**", "<p><strong><em>a</em> b</strong></p>"),
+    ("strong closing em", "**a *b***", "<p><strong>a <em>b</em></strong></p>"),
+    ("intraword run", "x***y and snake_case_name", "<p>x***y and snake_case_name</p>"),
+    ("strong and em", "**bold** and *em*", "<p><strong>bold</strong> and <em>em</em></p>"),
+    (
+        "indented code",
+        "para\n\n    x = 1 < 2\n\n    y\n\nafter",
+        "<p>para</p><pre><code>x = 1 &lt; 2\n\ny\n</code></pre><p>after</p>",
+    ),
+    ("indented lazy continuation", "para\n    continued", "<p>para\ncontinued</p>"),
+    ("backslash break", "Hard\\\nbreak", "<p>Hard<br>break</p>"),
+    ("two-space break", "Two  \nspaces", "<p>Two<br>spaces</p>"),
+    (
+        "bare url",
+        "URL: https://example.org/a_b/.",
+        '<p>URL: <a href="https://example.org/a_b/">https://example.org/a_b/</a>.</p>',
+    ),
+    ("www url", "www.example.org!", '<p><a href="http://www.example.org">www.example.org</a>!</p>'),
+    ("strikethrough", "~~old~~ new", "<p><del>old</del> new</p>"),
+    (
+        "table",
+        "| a | b |\n|:--|--:|\n| 1 | 2 |",
+        '<table><thead><tr><th align="left">a</th><th align="right">b</th></tr></thead>'
+        '<tbody><tr><td align="left">1</td><td align="right">2</td></tr></tbody></table>',
+    ),
+    ("setext", "Title\n=====\n\nSub\n---", "<h1>Title</h1><h2>Sub</h2>"),
+    (
+        "task list",
+        "- [x] done\n- [ ] open",
+        '<ul><li><input checked="" disabled="" type="checkbox"> done</li>'
+        '<li><input disabled="" type="checkbox"> open</li></ul>',
+    ),
+]
+
+# Left to marked: the generator writes no fragment for these.
+UNSUPPORTED = [
+    ("reference definition", "See [x][1].\n\n[1]: https://example.org"),
+]
+
+
+def normalize(html: str) -> str:
+    html = re.sub(r">\s+<", "><", html.strip())
+    return re.sub(r"<br>\s*", "<br>", html)
+
+
+def main() -> int:
+    failures = 0
+    for name, markdown, expected in FIXTURES:
+        actual = render_markdown(markdown)
+        if normalize(actual) != normalize(expected):
+            failures += 1
+            print(f"FAIL {name}\n  markdown: {markdown!r}\n  expected: {expected!r}\n  actual:   {actual!r}")
+        elif not is_supported(markdown):
+            failures += 1
+            print(f"FAIL {name}: is_supported() is False")
+    for name, markdown in UNSUPPORTED:
+        if is_supported(markdown):
+            failures += 1
+            print(f"FAIL {name}: is_supported() is True")
+    total = len(FIXTURES) + len(UNSUPPORTED)
+    print(f"{total - failures} of {total} fixtures pass")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the Zotero web API that scripts/update_zotero.py uses.
+
+Serves a synthetic, deterministic group library (100 to 100k items) with
+pagination, Total-Results / Last-Modified-Version headers, If-Modified-Since-Version,
+`since=` change streams, the deleted-objects endpoint, gzip, and configurable
+latency and 429 injection. Stdlib-only.
+
+Run standalone:
+
+    python3 benchmarks/zotero_stub_server.py --items 10000 --collections 40 --port 8765
+    ZOTERO_API_BASE=http://127.0.0.1:8765 ZOTERO_GROUP_ID=1 ZOTERO_COLLECTION_KEY=ROOTROOT \
+        python3 scripts/update_zotero.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+GROUP_ID = "1"
+ROOT_COLLECTION_KEY = "ROOTROOT"
+MAX_LIMIT = 100
+
+COLLECTIONS_RE = re.compile(r"^/groups/(\d+)/collections$")
+COLLECTION_ITEMS_RE = re.compile(r"^/groups/(\d+)/collections/([A-Za-z0-9]{8})/items/top$")
+GROUP_ITEMS_RE = re.compile(r"^/groups/(\d+)/items/top$")
+DELETED_RE = re.compile(r"^/groups/(\d+)/deleted$")
+
+KEY_ALPHABET = "23456789ABCDEFGHIJKLMNPQRSTUVWXYZ"
+WORDS = (
+    "risk appetite stablecoin liquidity formal proof agent browser displacement thesis "
+    "gaussian field circle average lattice market signal model inference workshop"
+).split()
+
+
+def make_key(prefix: str, n: int) -> str:
+    chars = []
+    for _ in range(8 - len(prefix)):
+        n, r = divmod(n, len(KEY_ALPHABET))
+        chars.append(KEY_ALPHABET[r])
+    return prefix + "".join(reversed(chars))
+
+
+class SyntheticLibrary:
+    """
+    A deterministic group library. Items are rendered on demand from their
+    index, so even 100k items only keep membership lists in memory.
+    """
+
+    def __init__(self, num_items: int, num_collections: int, nested: bool = True, seed: int = 1) -> None:
+        rng = random.Random(seed)
+        self.version = 1000
+        self.num_items = num_items
+        self.item_versions: dict[int, int] = {}
+        self.deleted_keys: dict[str, int] = {}
+
+        self.collections: list[dict[str, Any]] = []
+        parents = [ROOT_COLLECTION_KEY]
+        self.collections.append(self._collection(ROOT_COLLECTION_KEY, "Library", False))
+        for i in range(num_collections):
+            key = make_key("C", i)
+            # Roughly a quarter of collections nest under an earlier one.
+            parent = ROOT_COLLECTION_KEY
+            if nested and len(parents) > 1 and rng.random() < 0.25:
+                parent = rng.choice(parents[1:])
+            self.collections.append(self._collection(key, f"{rng.choice(WORDS).title()} {i}", parent))
+            parents.append(key)
+
+        child_keys = [c["key"] for c in self.collections[1:]]
+        self.members: dict[str, list[int]] = {key: [] for key in child_keys}
+        self.item_collections: list[list[str]] = []
+        for i in range(num_items):
+            picks = rng.sample(child_keys, k=min(len(child_keys), 1 + (rng.random() < 0.3) + (rng.random() < 0.1)))
+            self.item_collections.append(picks)
+            for key in picks:
+                self.members[key].append(i)
+        self.live_items = list(range(num_items))
+        for c in self.collections[1:]:
+            c["meta"]["numItems"] = len(self.members[c["key"]])
+
+    def _collection(self, key: str, name: str, parent: str | bool) -> dict[str, Any]:
+        return {
+            "key": key,
+            "version": self.version,
+            "data": {"key": key, "name": name, "parentCollection": parent},
+            "meta": {"numCollections": 0, "numItems": 0},
+        }
+
+    def item_key(self, index: int) -> str:
+        return make_key("I", index)
+
+    def item(self, index: int, style: str) -> dict[str, Any]:
+        rng = random.Random(index)
+        key = self.item_key(index)
+        title = " ".join(rng.choice(WORDS) for _ in range(6)).capitalize()
+        last = rng.choice(WORDS).title()
+        year = 1990 + index % 35
+        version = self.item_versions.get(index, 1000)
+        return {
+            "key": key,
+            "version": version,
+            "library": {"type": "group", "id": int(GROUP_ID), "name": "Synthetic"},
+            "links": {
+                "self": {"href": f"https://api.zotero.org/groups/{GROUP_ID}/items/{key}", "type": "application/json"},
+                "alternate": {"href": f"https://www.zotero.org/groups/{GROUP_ID}/items/{key}", "type": "text/html"},
+            },
+            "meta": {"creatorSummary": last, "parsedDate": str(year), "numChildren": rng.randint(0, 3)},
+            "bib": (
+                f'<div class="csl-bib-body" style="line-height: 2; padding-left: 1em; text-indent:-1em;">\n'
+                f'  <div class="csl-entry">{last}, A. ({year}). <i>{title}</i> [{style}]. '
+                f'<a href="https://doi.org/10.1000/{key.lower()}">https://doi.org/10.1000/{key.lower()}</a></div>\n</div>'
+            ),
+            "data": {
+                "key": key,
+                "version": version,
+                "itemType": "journalArticle",
+                "title": title,
+                "creators": [{"creatorType": "author", "firstName": "A.", "lastName": last}],
+                "abstractNote": " ".join(rng.choice(WORDS) for _ in range(40)),
+                "publicationTitle": "Journal of Synthetic Benchmarks",
+                "date": str(year),
+                "DOI": f"10.1000/{key.lower()}",
+                "url": "",
+                "tags": [{"tag": rng.choice(WORDS)}],
+                "collections": self.item_collections[index],
+                "relations": {},
+                "dateAdded": "2025-01-01T00:00:00Z",
+                "dateModified": "2025-01-01T00:00:00Z",
+            },
+        }
+
+    def touch(self, count: int, delete: int = 0, seed: int = 2) -> None:
+        """Simulate library edits: bump `count` items and delete `delete` more."""
+        rng = random.Random(seed)
+        self.version += 1
+        for index in rng.sample(range(self.num_items), k=min(count + delete, self.num_items)):
+            if delete > 0:
+                self.deleted_keys[self.item_key(index)] = self.version
+                for key in self.item_collections[index]:
+                    self.members[key].remove(index)
+                self.item_collections[index] = []
+                delete -= 1
+            else:
+                self.item_versions[index] = self.version
+        self.live_items = [i for i in range(self.num_items) if self.item_collections[i]]
+
+
+def select_fields(item: dict[str, Any], include: set[str]) -> dict[str, Any]:
+    # Like the API, drop the include-able parts that were not asked for.
+    return {k: v for k, v in item.items() if k not in {"data", "bib"} or k in include}
+
+
+class StubStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+        self.throttled = 0
+        self.not_modified = 0
+
+    def record(self, sent: int, status: int) -> None:
+        with self.lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            if status == 429:
+                self.throttled += 1
+            elif status == 304:
+                self.not_modified += 1
+
+    def as_dict(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "bytes_sent": self.bytes_sent,
+                "throttled": self.throttled,
+                "not_modified": self.not_modified,
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ZoteroStubServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        stub = self.server
+        if stub.latency_s:
+            time.sleep(stub.latency_s)
+
+        if stub.rate_429 and stub.rng_429.random() < stub.rate_429:
+            self.send_body(429, b"Rate limit exceeded", {"Retry-After": f"{stub.retry_after_s:g}"})
+            return
+
+        parts = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(parts.query))
+        library = stub.library
+        headers = {"Last-Modified-Version": str(library.version)}
+
+        since_header = self.headers.get("If-Modified-Since-Version")
+        if since_header is not None and since_header.isdigit() and int(since_header) >= library.version:
+            self.send_body(304, b"", headers)
+            return
+
+        start = int(query.get("start") or 0)
+        limit = min(int(query.get("limit") or 25), MAX_LIMIT)
+        style = query.get("style") or "apa"
+        since = int(query["since"]) if str(query.get("since") or "").isdigit() else None
+        include = set((query.get("include") or "data").split(","))
+
+        if COLLECTIONS_RE.match(parts.path):
+            rows = library.collections
+            self.send_json(rows[start : start + limit], len(rows), headers)
+        elif match := COLLECTION_ITEMS_RE.match(parts.path):
+            indices = library.members.get(match.group(2), [])
+            page = [select_fields(library.item(i, style), include) for i in indices[start : start + limit]]
+            self.send_json(page, len(indices), headers)
+        elif GROUP_ITEMS_RE.match(parts.path):
+            indices = library.live_items
+            if since is not None:
+                indices = [i for i in indices if library.item_versions.get(i, 1000) > since]
+            page = [select_fields(library.item(i, style), include) for i in indices[start : start + limit]]
+            self.send_json(page, len(indices), headers)
+        elif DELETED_RE.match(parts.path):
+            deleted = [k for k, v in library.deleted_keys.items() if since is None or v > since]
+            self.send_json({"collections": [], "searches": [], "items": deleted, "tags": [], "settings": []}, None, headers)
+        else:
+            self.send_body(404, b"Not found", {})
+
+    def send_json(self, payload: Any, total: int | None, headers: dict[str, str]) -> None:
+        if total is not None:
+            headers["Total-Results"] = str(total)
+        headers["Content-Type"] = "application/json"
+        self.send_body(200, json.dumps(payload).encode("utf-8"), headers)
+
+    def send_body(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+        if body and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, compresslevel=5)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.server.stats.record(len(body), status)
+
+
+class ZoteroStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        library: SyntheticLibrary,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after_s: float = 0.05,
+        seed: int = 1,
+    ) -> None:
+        super().__init__((host, port), StubHandler)
+        self.library = library
+        self.latency_s = latency_ms / 1000.0
+        self.rate_429 = rate_429
+        self.retry_after_s = retry_after_s
+        self.rng_429 = random.Random(seed)
+        self.stats = StubStats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="zotero-stub", daemon=True)
+        thread.start()
+        return thread
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000, help="Number of synthetic items (100 to 100000)")
+    parser.add_argument("--collections", type=int, default=20, help="Number of collections below the root")
+    parser.add_argument("--flat", action="store_true", help="Make every collection a direct child of the root")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    library = SyntheticLibrary(args.items, args.collections, nested=not args.flat)
+    server = ZoteroStubServer(
+        library,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        rate_429=args.rate_429,
+        retry_after_s=args.retry_after,
+    )
+    print(f"serving {args.items} items in {args.collections} collections at {server.base_url}")
+    print(f"group id {GROUP_ID}, collection key {ROOT_COLLECTION_KEY}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats.as_dict()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""
+Stage timings and counters shared by the site build scripts.
+
+Scripts time their stages with `with METRICS.stage("items"):` and bump
+counters (requests, bytes in and out, cache hits, files written) with
+METRICS.count(). Recording is cheap and always on; main() wraps its work in
+METRICS.recording() and the script's --metrics flag only decides whether
+the result is written out, as JSON for CI to keep and as a short summary on
+stderr. Stdlib-only like the scripts using it.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+
+METRICS_VERSION = 1
+
+
+def format_bytes(value: int) -> str:
+    if value < 1024:
+        return f"{value} B"
+    if value < 1024 * 1024:
+        return f"{value / 1024:.1f} KB"
+    return f"{value / (1024 * 1024):.1f} MB"
+
+
+class BuildMetrics:
+    """Wall time per stage (summed over repeated entries) and named counters; safe to use from worker threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, script: str = "") -> None:
+        with self._lock:
+            self.script = script
+            self.started_at = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+            self._started = time.perf_counter()
+            self.stages: dict[str, dict[str, float]] = {}
+            self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stage = self.stages.setdefault(name, {"wall_s": 0.0, "calls": 0})
+                stage["wall_s"] += elapsed
+                stage["calls"] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "version": METRICS_VERSION,
+                "script": self.script,
+                "started_at": self.started_at.isoformat().replace("+00:00", "Z"),
+                "wall_s": round(time.perf_counter() - self._started, 4),
+                "stages": {
+                    name: {"wall_s": round(stage["wall_s"], 4), "calls": int(stage["calls"])}
+                    for name, stage in self.stages.items()
+                },
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def summary(self, payload: dict[str, Any] | None = None) -> str:
+        payload = payload or self.as_dict()
+        total = payload["wall_s"]
+        lines = [f"metrics for {payload['script'] or 'build'}: {total:.3f} s"]
+        width = max((len(name) for name in payload["stages"]), default=0)
+        for name, stage in payload["stages"].items():
+            share = stage["wall_s"] / total * 100 if total else 0
+            calls = f"  ({stage['calls']} calls)" if stage["calls"] > 1 else ""
+            lines.append(f"  {name:<{width}} {stage['wall_s']:>9.3f} s {share:>4.0f}%{calls}")
+        counters = [
+            f"{name} {format_bytes(value) if 'bytes' in name else value}" for name, value in payload["counters"].items()
+        ]
+        if counters:
+            lines.append("  " + ", ".join(counters))
+        return "\n".join(lines)
+
+    @contextmanager
+    def recording(self, script: str, path: str | None) -> Iterator[None]:
+        """Start afresh for `script`; afterwards report() to `path`, if given, even when the block fails."""
+        self.reset(script)
+        try:
+            yield
+        finally:
+            if path:
+                self.report(Path(path))
+
+    def report(self, path: Path) -> None:
+        """Write the metrics as JSON to `path` and print the summary to stderr."""
+        payload = self.as_dict()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload, indent=4) + "\n", encoding="utf-8")
+        print(self.summary(payload), file=sys.stderr)
+
+
+METRICS = BuildMetrics()
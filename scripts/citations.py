@@ -0,0 +1,30 @@
+"""
+Citation identifiers shared by the site build scripts.
+
+The pages normalize DOIs the same way before looking them up in the
+generated indexes, so keep normalizeDoi() in library.html and
+notebook-viewer.html in step with normalize_doi() here. Notebooks cite
+library items with Markdown links to doi:... or zotero:KEY targets.
+"""
+
+from __future__ import annotations
+
+import re
+
+
+DOI_PREFIX_RE = re.compile(r"^(?:doi:\s*|https?://(?:dx\.)?doi\.org/)", re.IGNORECASE)
+DOI_LINK_RE = re.compile(r"\]\(\s*doi:([^\s)]+)\s*\)", re.IGNORECASE)
+ZOTERO_LINK_RE = re.compile(r"\]\(\s*zotero:([A-Za-z0-9]+)\s*\)", re.IGNORECASE)
+
+
+def normalize_doi(raw: object) -> str:
+    """Bare, lower-cased DOI: drops a doi: or doi.org URL prefix; '' for empty input."""
+    text = str(raw or "").strip()
+    return DOI_PREFIX_RE.sub("", text).strip().lower()
+
+
+def extract_citations(text: str) -> dict[str, list[str]]:
+    """Distinct cited DOIs (normalized) and Zotero item keys, in order of first appearance."""
+    dois = dict.fromkeys(normalize_doi(m.group(1)) for m in DOI_LINK_RE.finditer(text))
+    keys = dict.fromkeys(m.group(1).strip() for m in ZOTERO_LINK_RE.finditer(text))
+    return {"doi": [d for d in dois if d], "zotero": [k for k in keys if k]}
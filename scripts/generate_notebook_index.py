@@ -2,23 +2,62 @@
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from html import escape
+from html import escape, unescape
+from itertools import chain
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator
 from urllib.parse import quote
 
+from build_metrics import METRICS
+from citations import extract_citations, normalize_doi
+from render_markdown import is_supported, render_markdown
+from search_index import build_search_index, term_counts
+from site_outputs import (
+    dumps_compact,
+    format_size_report,
+    write_compressed_siblings,
+    write_release_variants,
+    write_text_if_changed,
+)
+from zotero_snapshot import PreviousSnapshot
+
 
 ROOT = Path(__file__).resolve().parents[1]
 SITE_BASE_URL = "https://jswachter.github.io"
 
 NOTEBOOKS_DIR = ROOT / "notebooks"
 INDEX_PATH = NOTEBOOKS_DIR / "notebook-index.json"
+CITATION_INDEX_PATH = NOTEBOOKS_DIR / "citation-index.json"
+SEARCH_DIR = NOTEBOOKS_DIR / "search"
+SEARCH_MANIFEST_NAME = "manifest.json"
+PAGES_DIR = NOTEBOOKS_DIR / "index"
+PAGES_MANIFEST_NAME = "manifest.json"
+UNDATED_PAGE = "undated"
+RENDERED_DIR = NOTEBOOKS_DIR / "rendered"
+ZOTERO_DIR = ROOT / "zotero"
+ZOTERO_SNAPSHOT_PATH = ZOTERO_DIR / "library-items.json"
 NOTEBOOKS_HTML_PATH = ROOT / "notebooks.html"
 SITEMAP_PATH = ROOT / "sitemap.xml"
 ROBOTS_PATH = ROOT / "robots.txt"
+BUILD_CACHE_PATH = ROOT / ".cache" / "notebook-index.json"
+
+# Parsed results are only reused while these sources are unchanged.
+PARSER_SOURCES = tuple(
+    Path(__file__).resolve().with_name(name)
+    for name in ("generate_notebook_index.py", "citations.py", "search_index.py")
+)
+# Rendered fragments are redone when the renderer changes (the parser sources
+# above already invalidate the whole cache).
+RENDER_SOURCES = (Path(__file__).resolve().with_name("render_markdown.py"),)
 
 LIST_START = "<!-- BEGIN AUTO-GENERATED NOTEBOOK LIST -->"
 LIST_END = "<!-- END AUTO-GENERATED NOTEBOOK LIST -->"
@@ -26,26 +65,34 @@ LIST_END = "<!-- END AUTO-GENERATED NOTEBOOK LIST -->"
 KEY_VALUE_RE = re.compile(r"^([A-Za-z0-9_-]+):\s*(.*)$")
 TAG_ITEM_RE = re.compile(r"^\s*-\s*(.+?)\s*$")
 FILENAME_DATE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+CITATION_HREF_RE = re.compile(r'<a href="(doi|zotero):([^"]*)"', re.IGNORECASE)
+ZOTERO_KEY_RE = re.compile(r"^[A-Za-z0-9]+$")
+SUMMARY_BULLET_RE = re.compile(r"^[-*]\s+")
+SUMMARY_NUMBER_RE = re.compile(r"^\d+\.\s+")
+SUMMARY_LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+# notebooks.html carries whole index pages, newest first, until it lists at least this many entries.
+LIST_BAKED_MIN_ENTRIES = 30
+
+# Below this many notebooks to parse, worker start-up costs more than it saves.
+PARALLEL_MIN_FILES = 32
 
 
 def read_text(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def write_text(path: Path, content: str) -> None:
-    path.write_text(content, encoding="utf-8")
+def write_text(path: Path, content: str) -> bool:
+    return write_text_if_changed(path, content)
 
 
-def parse_frontmatter(text: str) -> tuple[dict[str, Any], list[str]]:
-    lines = text.splitlines()
-    if not lines or lines[0].strip() != "---":
-        return {}, lines
-
+def parse_frontmatter_lines(lines: Iterable[str]) -> dict[str, Any]:
+    """Metadata from the lines between the opening and closing --- of a frontmatter block."""
     meta: dict[str, Any] = {}
     tags_list_mode = False
-    i = 1
-    while i < len(lines) and lines[i].strip() != "---":
-        line = lines[i].rstrip()
+    for line in lines:
+        line = line.rstrip()
         match = KEY_VALUE_RE.match(line)
         if match:
             key = match.group(1).strip()
@@ -63,9 +110,19 @@ def parse_frontmatter(text: str) -> tuple[dict[str, Any], list[str]]:
                     meta["tags"].append(tag_match.group(1).strip())
                 else:
                     tags_list_mode = False
-        i += 1
+    return meta
+
+
+def parse_frontmatter(text: str) -> tuple[dict[str, Any], list[str]]:
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != "---":
+        return {}, lines
 
-    content_lines = lines[i + 1 :] if i < len(lines) and lines[i].strip() == "---" else lines
+    i = 1
+    while i < len(lines) and lines[i].strip() != "---":
+        i += 1
+    meta = parse_frontmatter_lines(lines[1:i])
+    content_lines = lines[i + 1 :] if i < len(lines) else lines
     return meta, content_lines
 
 
@@ -93,14 +150,12 @@ def parse_tags(raw: Any) -> list[str]:
     return tags
 
 
-def derive_title(meta: dict[str, Any], content_lines: list[str], filename: str) -> str:
+def derive_title(meta: dict[str, Any], heading: str, filename: str) -> str:
     title = str(meta.get("title") or "").strip()
     if title:
         return title
-    for line in content_lines:
-        stripped = line.strip()
-        if stripped.startswith("# "):
-            return stripped[2:].strip()
+    if heading:
+        return heading
     return filename.replace(".md", "").replace("-", " ").strip() or "(untitled)"
 
 
@@ -112,38 +167,73 @@ def derive_date(meta: dict[str, Any], filename: str) -> str:
     return match.group(1) if match else ""
 
 
-def derive_summary(content_lines: list[str]) -> str:
+def iter_lines(text: str) -> Iterator[str]:
+    """Lines of `text` with their endings, sliced one at a time instead of all at once like splitlines()."""
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start) + 1 or len(text)
+        yield text[start:end]
+        start = end
+
+
+def scan_notebook_head(lines: Iterable[str]) -> tuple[dict[str, Any], str, str, int]:
+    """
+    Frontmatter, first "# " heading and derived summary of a notebook in one
+    pass over `lines` (with line endings: an open file or iter_lines()),
+    stopping as soon as all of them are known instead of reading the rest.
+    Also returns the length of the frontmatter block in characters, so the
+    body is text[length:]. The summary is "" if the frontmatter has one.
+    """
+    it = iter(lines)
+    meta: dict[str, Any] = {}
+    head_len = 0
+    first = next(it, None)
+    body: Iterable[str] = it
+    if first is not None and first.strip() == "---":
+        block = [first]
+        for line in it:
+            block.append(line)
+            if line.strip() == "---":
+                head_len = sum(map(len, block))
+                meta = parse_frontmatter_lines(block[1:-1])
+                break
+        else:
+            # Never closed: the whole file is content, as in parse_frontmatter().
+            meta = parse_frontmatter_lines(block[1:])
+            body = block
+    elif first is not None:
+        body = chain((first,), it)
+
+    need_title = not str(meta.get("title") or "").strip()
+    summary_done = bool(str(meta.get("summary") or "").strip())
+    heading = ""
     in_code = False
     parts: list[str] = []
-
-    for line in content_lines:
+    joined_len = -1
+    for line in body:
         stripped = line.strip()
-        if stripped.startswith("```"):
-            in_code = not in_code
-            continue
-        if in_code:
-            continue
-        if not stripped:
-            if parts:
-                break
-            continue
-        if stripped.startswith("#"):
-            continue
-        if stripped.startswith(">"):
-            continue
-
-        cleaned = re.sub(r"^[-*]\s+", "", stripped)
-        cleaned = re.sub(r"^\d+\.\s+", "", cleaned)
-        cleaned = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", cleaned)
-        parts.append(cleaned)
-
-        if len(" ".join(parts)) > 220:
+        if need_title and stripped.startswith("# "):
+            heading = stripped[2:].strip()
+            need_title = False
+        if not summary_done:
+            if stripped.startswith("```"):
+                in_code = not in_code
+            elif in_code:
+                pass
+            elif not stripped:
+                summary_done = bool(parts)
+            elif not stripped.startswith(("#", ">")):
+                cleaned = SUMMARY_LINK_RE.sub(r"\1", SUMMARY_NUMBER_RE.sub("", SUMMARY_BULLET_RE.sub("", stripped)))
+                parts.append(cleaned)
+                joined_len += len(cleaned) + 1
+                summary_done = joined_len > 220
+        if summary_done and not need_title:
             break
 
-    summary = re.sub(r"\s+", " ", " ".join(parts)).strip()
+    summary = WHITESPACE_RE.sub(" ", " ".join(parts)).strip()
     if len(summary) > 180:
         summary = summary[:177].rstrip() + "..."
-    return summary
+    return meta, heading, summary, head_len
 
 
 def safe_data_attr(value: str) -> str:
@@ -158,36 +248,166 @@ def url_quote(value: str) -> str:
 
 
 def build_index_entries() -> list[dict[str, Any]]:
-    entries: list[dict[str, Any]] = []
-    for path in NOTEBOOKS_DIR.rglob("*.md"):
+    entries, _ = scan_notebooks()
+    return entries
+
+
+def parse_notebook(rel: str, text: str) -> tuple[dict[str, Any], dict[str, list[str]], dict[str, int]]:
+    """Index entry, cited DOIs / Zotero keys and search term counts for the notebook at `rel` with source `text`."""
+    filename = rel.rsplit("/", 1)[-1]
+    meta, heading, derived_summary, head_len = scan_notebook_head(iter_lines(text))
+
+    title = derive_title(meta, heading, filename)
+    date_str = derive_date(meta, filename)
+    tags = parse_tags(meta.get("tags"))
+    collection = str(meta.get("collection") or "").strip() or "General"
+    summary = str(meta.get("summary") or "").strip() or derived_summary
+
+    entry = {
+        "title": title,
+        "date": date_str,
+        "path": rel,
+        "summary": summary,
+        "tags": tags,
+        "collection": collection,
+    }
+    terms = term_counts("\n".join([title, " ".join(tags), text[head_len:]]))
+    return entry, extract_citations(text), terms
+
+
+def parser_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for source in PARSER_SOURCES:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def load_build_cache() -> dict[str, dict[str, Any]]:
+    """Cached parse results by notebook path; empty when missing, unreadable or from another parser."""
+    try:
+        data = json.loads(BUILD_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("parser") != parser_fingerprint():
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def save_build_cache(cache: dict[str, dict[str, Any]]) -> None:
+    payload = {"parser": parser_fingerprint(), "files": cache}
+    write_text_if_changed(BUILD_CACHE_PATH, json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+def iter_notebook_paths() -> list[tuple[str, Path]]:
+    paths = []
+    for path in sorted(NOTEBOOKS_DIR.rglob("*.md")):
         rel = path.relative_to(ROOT).as_posix()
         if rel.startswith("notebooks/drafts/"):
             continue
         if path.name.lower() == "readme.md":
             continue
-
-        text = read_text(path)
-        meta, content_lines = parse_frontmatter(text)
-
-        title = derive_title(meta, content_lines, path.name)
-        date_str = derive_date(meta, path.name)
-        tags = parse_tags(meta.get("tags"))
-        collection = str(meta.get("collection") or "").strip() or "General"
-
-        summary = str(meta.get("summary") or "").strip()
-        if not summary:
-            summary = derive_summary(content_lines)
-
-        entries.append(
-            {
-                "title": title,
-                "date": date_str,
-                "path": rel,
-                "summary": summary,
-                "tags": tags,
-                "collection": collection,
-            }
-        )
+        paths.append((rel, path))
+    return paths
+
+
+def stat_matches(cached: dict[str, Any] | None, st: os.stat_result) -> bool:
+    return cached is not None and (cached.get("mtime_ns"), cached.get("size")) == (st.st_mtime_ns, st.st_size)
+
+
+def load_notebook_record(rel: str, path: Path, cached: dict[str, Any] | None) -> tuple[dict[str, Any], bool]:
+    """Build-cache record for one notebook, reusing `cached` when the file is unchanged; also whether it was parsed."""
+    st = path.stat()
+    if stat_matches(cached, st):
+        return cached, False
+
+    raw = path.read_bytes()
+    sha = hashlib.sha256(raw).hexdigest()
+    if cached is not None and cached.get("sha256") == sha:
+        return dict(cached, mtime_ns=st.st_mtime_ns, size=st.st_size), False
+
+    entry, cited, terms = parse_notebook(rel, raw.decode("utf-8"))
+    record = {
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": sha,
+        "entry": entry,
+        "citations": cited,
+        "terms": terms,
+    }
+    return record, True
+
+
+def resolve_jobs(jobs: int) -> int:
+    return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+def load_notebook_records(
+    pending: list[tuple[str, Path, dict[str, Any] | None]],
+    jobs: int = 1,
+) -> list[tuple[dict[str, Any], bool]]:
+    """load_notebook_record() for each of `pending`, in order, across `jobs` worker processes."""
+    jobs = min(resolve_jobs(jobs), len(pending))
+    if jobs <= 1 or len(pending) < PARALLEL_MIN_FILES:
+        return [load_notebook_record(rel, path, cached) for rel, path, cached in pending]
+
+    # A few chunks per worker keeps IPC round trips low while still balancing uneven file sizes.
+    chunksize = max(1, -(-len(pending) // (jobs * 4)))
+    rels, paths, cached = zip(*pending)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(load_notebook_record, rels, paths, cached, chunksize=chunksize))
+
+
+def scan_notebooks(
+    cache: dict[str, dict[str, Any]] | None = None,
+    stats: dict[str, int] | None = None,
+    jobs: int = 1,
+) -> tuple[list[dict[str, Any]], dict[str, dict[str, list[str]]]]:
+    """
+    Index entries (newest first) plus each notebook's citations, keyed by path.
+
+    With a `cache` from load_build_cache(), a notebook whose size and mtime
+    match its cached record is not read at all, and one whose content hash
+    still matches is read but not re-parsed. The cache is updated in place to
+    hold exactly the current notebooks; `stats` counts "parsed" and "cached".
+    The remaining notebooks are parsed across `jobs` processes (0 = one per
+    core); output does not depend on `jobs`.
+    """
+    cache_hits: dict[str, dict[str, Any]] = {}
+    pending: list[tuple[str, Path, dict[str, Any] | None]] = []
+    paths = iter_notebook_paths()
+    for rel, path in paths:
+        cached = cache.get(rel) if cache is not None else None
+        if stat_matches(cached, path.stat()):
+            cache_hits[rel] = cached
+        else:
+            pending.append((rel, path, cached))
+
+    counts = {"parsed": 0, "cached": len(cache_hits)}
+    loaded: dict[str, dict[str, Any]] = {}
+    for (rel, _, _), (record, parsed) in zip(pending, load_notebook_records(pending, jobs)):
+        loaded[rel] = record
+        counts["parsed" if parsed else "cached"] += 1
+    METRICS.count("notebooks_parsed", counts["parsed"])
+    METRICS.count("notebooks_cached", counts["cached"])
+    METRICS.count("bytes_in", sum(record["size"] for record in loaded.values()))
+
+    fresh: dict[str, dict[str, Any]] = {}
+    entries: list[dict[str, Any]] = []
+    citations: dict[str, dict[str, list[str]]] = {}
+    for rel, _ in paths:
+        record = cache_hits[rel] if rel in cache_hits else loaded[rel]
+        fresh[rel] = record
+        entries.append(dict(record["entry"]))
+        cited = record["citations"]
+        if cited["doi"] or cited["zotero"]:
+            citations[rel] = cited
+
+    if cache is not None:
+        cache.clear()
+        cache.update(fresh)
+    if stats is not None:
+        stats.update(counts)
 
     def sort_key(e: dict[str, Any]) -> tuple[str, str]:
         date_str = str(e.get("date") or "")
@@ -196,21 +416,338 @@ def build_index_entries() -> list[dict[str, Any]]:
         return (date_str, title)
 
     entries.sort(key=sort_key, reverse=True)
-    return entries
+    return entries, citations
 
 
-def write_notebook_index(entries: list[dict[str, Any]]) -> None:
+def index_generated_date(entries: list[dict[str, Any]]) -> str:
     generated = ""
     for entry in entries:
         date_str = str(entry.get("date") or "")
         if re.fullmatch(r"\d{4}-\d{2}-\d{2}", date_str):
             generated = max(generated, date_str)
-    if not generated:
-        generated = date.today().isoformat()
+    return generated or date.today().isoformat()
+
 
-    data = {"generated": generated, "entries": entries}
+def write_notebook_index(entries: list[dict[str, Any]], release: bool = False) -> bool:
+    data = {"generated": index_generated_date(entries), "entries": entries}
     content = json.dumps(data, indent=4, ensure_ascii=True) + "\n"
-    write_text(INDEX_PATH, content)
+    changed = write_text(INDEX_PATH, content)
+
+    if release:
+        sizes = write_release_variants(INDEX_PATH, data, ensure_ascii=True)
+        print(format_size_report([(INDEX_PATH.relative_to(ROOT).as_posix(), sizes)]))
+    return changed
+
+
+def page_key(entry: dict[str, Any]) -> str:
+    date_str = str(entry.get("date") or "")
+    return date_str[:4] if re.match(r"\d{4}", date_str) else UNDATED_PAGE
+
+
+def paginate_entries(entries: list[dict[str, Any]]) -> list[tuple[str, list[dict[str, Any]]]]:
+    """Sorted `entries` split into per-year pages, newest first (undated entries sort, and page, last)."""
+    pages: dict[str, list[dict[str, Any]]] = {}
+    for entry in entries:
+        pages.setdefault(page_key(entry), []).append(entry)
+    return list(pages.items())
+
+
+def baked_page_keys(pages: list[tuple[str, list[dict[str, Any]]]]) -> list[str]:
+    keys: list[str] = []
+    count = 0
+    for key, page_entries in pages:
+        if count >= LIST_BAKED_MIN_ENTRIES:
+            break
+        keys.append(key)
+        count += len(page_entries)
+    return keys
+
+
+def write_notebook_pages(entries: list[dict[str, Any]], release: bool = False) -> bool:
+    """
+    Write the notebook index again as notebooks/index/{year}.json pages plus
+    a small manifest listing each page's entry count and content hash, and
+    which pages notebooks.html already lists, so pages can fetch only the
+    years they show. Pages no longer in the index are removed.
+    """
+    pages = paginate_entries(entries)
+    payloads: dict[str, Any] = {}
+    summaries = []
+    for key, page_entries in pages:
+        data = {"key": key, "entries": page_entries}
+        payloads[f"{key}.json"] = data
+        digest = hashlib.sha256(json.dumps(data, indent=4, ensure_ascii=True).encode("utf-8")).hexdigest()
+        summaries.append({"key": key, "count": len(page_entries), "hash": digest[:16]})
+    payloads[PAGES_MANIFEST_NAME] = {
+        "generated": index_generated_date(entries),
+        "total": len(entries),
+        "baked": baked_page_keys(pages),
+        "pages": summaries,
+    }
+
+    changed = False
+    rows = []
+    for name, data in payloads.items():
+        path = PAGES_DIR / name
+        changed = write_text(path, json.dumps(data, indent=4, ensure_ascii=True) + "\n") or changed
+        if release:
+            rows.append((path.relative_to(ROOT).as_posix(), write_release_variants(path, data, ensure_ascii=True)))
+
+    for path in PAGES_DIR.iterdir():
+        if path.name.split(".", 1)[0] + ".json" not in payloads:
+            path.unlink()
+            changed = True
+
+    if release:
+        print(format_size_report(rows))
+    return changed
+
+
+def build_citation_index(
+    entries: list[dict[str, Any]],
+    citations: dict[str, dict[str, list[str]]],
+) -> dict[str, Any]:
+    """
+    Cross-index between notebooks and library items: DOI / Zotero key ->
+    citing notebook paths (newest first), and notebook path -> its title
+    and cited DOIs and keys.
+    """
+    notebooks: dict[str, dict[str, Any]] = {}
+    by_doi: dict[str, list[str]] = {}
+    by_key: dict[str, list[str]] = {}
+    for entry in entries:
+        path = str(entry.get("path") or "")
+        cited = citations.get(path)
+        if not cited:
+            continue
+        notebooks[path] = {"title": entry.get("title"), "doi": cited["doi"], "zotero": cited["zotero"]}
+        for doi in cited["doi"]:
+            by_doi.setdefault(doi, []).append(path)
+        for key in cited["zotero"]:
+            by_key.setdefault(key, []).append(path)
+
+    return {
+        "generated": index_generated_date(entries),
+        "doi": dict(sorted(by_doi.items())),
+        "zotero": dict(sorted(by_key.items())),
+        "notebooks": notebooks,
+    }
+
+
+def write_citation_index(
+    entries: list[dict[str, Any]],
+    citations: dict[str, dict[str, list[str]]],
+    release: bool = False,
+) -> bool:
+    data = build_citation_index(entries, citations)
+    changed = write_text(CITATION_INDEX_PATH, json.dumps(data, indent=4, ensure_ascii=True) + "\n")
+
+    if release:
+        sizes = write_release_variants(CITATION_INDEX_PATH, data, ensure_ascii=True)
+        print(format_size_report([(CITATION_INDEX_PATH.relative_to(ROOT).as_posix(), sizes)]))
+    return changed
+
+
+def write_search_index(records: dict[str, dict[str, Any]], release: bool = False) -> bool:
+    """
+    Write the full-text search manifest and its term-prefix shards under
+    notebooks/search/ from build-cache `records`, and remove shards (and their
+    compressed siblings) that are no longer part of the index.
+    """
+    manifest, shards = build_search_index((rel, records[rel]["terms"]) for rel in sorted(records))
+    outputs = {f"{prefix}.json": dumps_compact(shard) for prefix, shard in shards.items()}
+    outputs[SEARCH_MANIFEST_NAME] = dumps_compact(manifest)
+
+    changed = False
+    total = {"compact": 0, "gzip": 0}
+    for name, content in outputs.items():
+        path = SEARCH_DIR / name
+        changed = write_text(path, content) or changed
+        total["compact"] += len(content.encode("utf-8"))
+        if release:
+            total["gzip"] += write_compressed_siblings(path, content.encode("utf-8"))["gzip"]
+
+    for path in SEARCH_DIR.iterdir():
+        if path.name.split(".", 1)[0] + ".json" not in outputs:
+            path.unlink()
+            changed = True
+
+    if release:
+        print(
+            f"{SEARCH_DIR.relative_to(ROOT).as_posix()}/: {len(shards)} shards, "
+            f"{total['compact']} bytes compact, {total['gzip']} gzip"
+        )
+    return changed
+
+
+def rendered_path(rel: str) -> Path:
+    """notebooks/a/b.md -> notebooks/rendered/a/b.html"""
+    return RENDERED_DIR / Path(rel).relative_to("notebooks").with_suffix(".html")
+
+
+def renderer_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for source in RENDER_SOURCES:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def library_fingerprint() -> str:
+    """Changes whenever a file of the Zotero snapshot does; from stat() alone."""
+    digest = hashlib.sha256()
+    for path in sorted(ZOTERO_DIR.rglob("*.json")) if ZOTERO_DIR.is_dir() else []:
+        st = path.stat()
+        digest.update(f"{path.relative_to(ZOTERO_DIR).as_posix()}:{st.st_mtime_ns}:{st.st_size}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def load_zotero_library() -> dict[str, Any]:
+    """The snapshot's source plus its items by key and by normalized DOI, for resolving references."""
+    snapshot = PreviousSnapshot(ZOTERO_SNAPSHOT_PATH)
+    source = snapshot.meta.get("source") if isinstance(snapshot.meta.get("source"), dict) else {}
+    by_key: dict[str, dict[str, Any]] = {}
+    by_doi: dict[str, dict[str, Any]] = {}
+    for collection_key in sorted(snapshot.collection_keys()):
+        for item in snapshot.items(collection_key):
+            if item.get("key"):
+                by_key[str(item["key"])] = item
+            data = item.get("data") if isinstance(item.get("data"), dict) else {}
+            doi = normalize_doi(data.get("DOI") or data.get("doi"))
+            if doi:
+                by_doi[doi] = item
+    return {"source": source, "by_key": by_key, "by_doi": by_doi}
+
+
+def doi_to_url(raw: object) -> str:
+    # Same escaping as encodeURIComponent() with "/" kept, like doiToUrl() in notebook-viewer.html.
+    doi = normalize_doi(raw)
+    return "https://doi.org/" + quote(doi, safe="/!~*'()") if doi else ""
+
+
+def external_url(raw: object) -> str:
+    url = str(raw or "").strip()
+    return url if re.match(r"^https?://", url, re.IGNORECASE) else ""
+
+
+def rendered_citations(content_html: str) -> list[tuple[str, str]]:
+    """Distinct ("doi" | "zotero", id) links of rendered content in document order, as the viewer collects them."""
+    citations: dict[tuple[str, str], None] = {}
+    for match in CITATION_HREF_RE.finditer(content_html):
+        kind = match.group(1).lower()
+        target = unescape(match.group(2)).strip()
+        if kind == "doi":
+            target = normalize_doi(target)
+        elif not ZOTERO_KEY_RE.match(target):
+            continue
+        if target:
+            citations[(kind, target)] = None
+    return list(citations)
+
+
+def external_link(href: str, label: str) -> str:
+    return f'<a href="{escape(href)}" target="_blank" rel="noopener noreferrer">{escape(label)}</a>'
+
+
+def build_references_html(citations: list[tuple[str, str]], library: dict[str, Any]) -> str:
+    """The References section renderReferences() in notebook-viewer.html would build from `library`."""
+    items = []
+    for kind, ref_id in citations:
+        item = library["by_key"].get(ref_id) if kind == "zotero" else library["by_doi"].get(ref_id)
+        bib = item.get("bib") if item else None
+        if isinstance(bib, str) and bib.strip():
+            body = bib
+        elif kind == "doi":
+            body = external_link(doi_to_url(ref_id), ref_id)
+        else:
+            body = external_link(f"library.html#z-{ref_id}", ref_id)
+
+        links = []
+        if kind == "zotero":
+            links.append(external_link(f"library.html#z-{ref_id}", "Library"))
+        if kind == "doi":
+            links.append(external_link(doi_to_url(ref_id), "DOI"))
+        elif item and isinstance(item.get("data"), dict):
+            url_href = external_url(item["data"].get("url"))
+            doi_href = doi_to_url(item["data"].get("DOI") or item["data"].get("doi"))
+            if url_href and url_href != doi_href:
+                links.append(external_link(url_href, "URL"))
+            if doi_href:
+                links.append(external_link(doi_href, "DOI"))
+        if links:
+            body += f'<div class="ref-links">{"".join(links)}</div>'
+        items.append(f"<li>{body}</li>")
+    return '<section id="references" class="references"><h2>References</h2><ol>\n' + "\n".join(items) + "\n</ol></section>\n"
+
+
+def build_rendered_notebook(entry: dict[str, Any], text: str, library: dict[str, Any] | None) -> str:
+    """
+    HTML fragment notebook-viewer.html shows instead of rendering the Markdown
+    itself. doi: and zotero: links are left for the viewer to rewrite; the
+    References section is resolved against the Zotero snapshot named by the
+    data-zotero-* attributes, which the viewer only trusts if they match its
+    own configuration.
+    """
+    _, content_lines = parse_frontmatter(text)
+    content = render_markdown("\n".join(content_lines))
+    citations = rendered_citations(content)
+
+    attrs = f'data-title="{escape(str(entry.get("title") or ""))}" data-date="{escape(str(entry.get("date") or ""))}"'
+    references = ""
+    if citations and library is not None:
+        source = library["source"]
+        attrs += (
+            f' data-zotero-group="{escape(str(source.get("group_id") or ""))}"'
+            f' data-zotero-collection="{escape(str(source.get("collection_key") or ""))}"'
+            f' data-zotero-style="{escape(str(source.get("style") or ""))}"'
+        )
+        references = build_references_html(citations, library)
+    return f'<div class="notebook-fragment" {attrs}>\n<div class="notebook-content">\n{content}</div>\n{references}</div>\n'
+
+
+def write_rendered_notebooks(records: dict[str, dict[str, Any]]) -> bool:
+    """
+    Write a pre-rendered HTML fragment for every notebook in build-cache
+    `records` under notebooks/rendered/ and remove fragments of notebooks that
+    are gone. A notebook is only re-rendered when its source hash, the renderer
+    or (if it cites anything) the Zotero snapshot changed since the fingerprint
+    stored in its record. Notebooks using Markdown the build-time renderer does
+    not handle get no fragment, so the viewer renders them with marked.
+    """
+    renderer = renderer_fingerprint()
+    library_fp = library_fingerprint()
+    library: dict[str, Any] | None = None
+
+    changed = False
+    expected: set[Path] = set()
+    for rel in sorted(records):
+        record = records[rel]
+        path = rendered_path(rel)
+        cites = bool(record["citations"]["doi"] or record["citations"]["zotero"])
+        key = f"{record['sha256']}:{renderer}:{library_fp if cites else ''}"
+        fingerprint = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        if record.get("rendered") == fingerprint and (path.exists() or record.get("render_fallback")):
+            METRICS.count("renders_cached")
+            if not record.get("render_fallback"):
+                expected.add(path)
+            continue
+        text = read_text(ROOT / rel)
+        METRICS.count("bytes_in", len(text.encode("utf-8")))
+        record["rendered"] = fingerprint
+        record["render_fallback"] = not is_supported(text)
+        if record["render_fallback"]:
+            continue
+        if cites and library is None:
+            library = load_zotero_library()
+        METRICS.count("renders")
+        expected.add(path)
+        changed = write_text(path, build_rendered_notebook(record["entry"], text, library)) or changed
+
+    if RENDERED_DIR.is_dir():
+        for path in sorted(RENDERED_DIR.rglob("*.html")):
+            if path not in expected:
+                path.unlink()
+                changed = True
+    return changed
 
 
 def build_entry_html(entry: dict[str, Any]) -> str:
@@ -239,14 +776,22 @@ def build_entry_html(entry: dict[str, Any]) -> str:
     )
 
 
-def write_notebooks_page_list(entries: list[dict[str, Any]]) -> None:
+def write_notebooks_page_list(entries: list[dict[str, Any]]) -> bool:
     html = read_text(NOTEBOOKS_HTML_PATH)
     if LIST_START not in html or LIST_END not in html:
         raise SystemExit(f"Missing list markers in {NOTEBOOKS_HTML_PATH}")
 
+    pages = paginate_entries(entries)
+    baked = baked_page_keys(pages)
     generated_lines = []
-    for entry in entries:
-        generated_lines.append(build_entry_html(entry))
+    for key, page_entries in pages:
+        if key in baked:
+            generated_lines.extend(build_entry_html(entry) for entry in page_entries)
+    if len(baked) < len(pages):
+        # The page script swaps this for a button that fetches the remaining years from notebooks/index/.
+        generated_lines.append(
+            '<p class="entries-more"><a href="notebooks/notebook-index.json">Older notebooks</a> are listed in the notebook index.</p>'
+        )
 
     if not generated_lines:
         generated = '            <p style="color: #888;">No notebook entries yet.</p>'
@@ -260,10 +805,10 @@ def write_notebooks_page_list(entries: list[dict[str, Any]]) -> None:
     before, rest = html.split(LIST_START, 1)
     _, after = rest.split(LIST_END, 1)
     updated = before + LIST_START + "\n" + generated + "\n            " + LIST_END + after
-    write_text(NOTEBOOKS_HTML_PATH, updated)
+    return write_text(NOTEBOOKS_HTML_PATH, updated)
 
 
-def write_sitemap(entries: list[dict[str, Any]]) -> None:
+def write_sitemap(entries: list[dict[str, Any]]) -> bool:
     urls: list[tuple[str, str]] = []
     urls.append((f"{SITE_BASE_URL}/", ""))
     urls.append((f"{SITE_BASE_URL}/index.html", ""))
@@ -286,10 +831,10 @@ def write_sitemap(entries: list[dict[str, Any]]) -> None:
             lines.append(f"        <lastmod>{escape(lastmod)}</lastmod>")
         lines.append("    </url>")
     lines.append("</urlset>")
-    write_text(SITEMAP_PATH, "\n".join(lines) + "\n")
+    return write_text(SITEMAP_PATH, "\n".join(lines) + "\n")
 
 
-def write_robots() -> None:
+def write_robots() -> bool:
     lines = [
         "User-agent: *",
         "Allow: /",
@@ -297,15 +842,171 @@ def write_robots() -> None:
         f"Sitemap: {SITE_BASE_URL}/sitemap.xml",
         "",
     ]
-    write_text(ROBOTS_PATH, "\n".join(lines))
+    return write_text(ROBOTS_PATH, "\n".join(lines))
+
+
+def regenerate(
+    cache: dict[str, dict[str, Any]],
+    jobs: int = 1,
+    release: bool = False,
+    search: bool = True,
+) -> str:
+    """
+    Re-scan the notebooks against `cache` and rewrite every output whose
+    content changed; with search=False the search index and the build cache
+    file are left for a later call. Returns a one-line summary.
+    """
+    stats: dict[str, int] = {}
+    with METRICS.stage("scan"):
+        entries, citations = scan_notebooks(cache, stats, jobs=jobs)
+
+    stages: list[tuple[str, Callable[[], bool]]] = [
+        ("index", lambda: write_notebook_index(entries, release=release)),
+        ("pages", lambda: write_notebook_pages(entries, release=release)),
+        ("citations", lambda: write_citation_index(entries, citations, release=release)),
+        ("render", lambda: write_rendered_notebooks(cache)),
+        ("page_list", lambda: write_notebooks_page_list(entries)),
+        ("sitemap", lambda: write_sitemap(entries)),
+        ("robots", write_robots),
+    ]
+    if search:
+        stages.append(("search", lambda: write_search_index(cache, release=release)))
+    changed = []
+    for name, write in stages:
+        with METRICS.stage(name):
+            changed.append(write())
+    if search:
+        with METRICS.stage("build_cache"):
+            save_build_cache(cache)
+    return (
+        f"{len(entries)} notebooks ({stats['parsed']} parsed, {stats['cached']} cached); "
+        f"{sum(changed)} of {len(changed)} outputs changed"
+    )
+
+
+def notebook_snapshot() -> dict[str, tuple[int, int]]:
+    """(mtime_ns, size) of every indexed notebook, from stat() alone."""
+    snapshot: dict[str, tuple[int, int]] = {}
+    for rel, path in iter_notebook_paths():
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        snapshot[rel] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def print_watch_error(changed: set[str], exc: Exception) -> None:
+    where = f" {', '.join(sorted(changed))}:" if changed else ""
+    print(f"[{time.strftime('%H:%M:%S')}]{where} error: {exc}", file=sys.stderr, flush=True)
+
+
+def watch(cache: dict[str, dict[str, Any]], jobs: int, interval: float, debounce: float, settle: float) -> None:
+    """
+    Poll the notebooks every `interval` seconds and regenerate once a burst of
+    changes has been quiet for `debounce` seconds. The slower search index and
+    build-cache writes wait until nothing has changed for `settle` seconds.
+    A failed rebuild (a notebook removed or half-written mid-save) is reported
+    and retried on the next change instead of ending the watch.
+    """
+    snapshot = notebook_snapshot()
+    changed: set[str] = set()
+    last_change = 0.0
+    search_due: float | None = None
+    print(f"watching {NOTEBOOKS_DIR.relative_to(ROOT).as_posix()}/ (Ctrl-C to stop)", flush=True)
+    try:
+        while True:
+            time.sleep(interval)
+            current = notebook_snapshot()
+            now = time.monotonic()
+            if current != snapshot:
+                changed.update(rel for rel in current.keys() | snapshot.keys() if current.get(rel) != snapshot.get(rel))
+                snapshot = current
+                last_change = now
+                search_due = None
+            elif changed and now - last_change >= debounce:
+                started = time.perf_counter()
+                try:
+                    summary = regenerate(cache, jobs=jobs, search=False)
+                except (OSError, ValueError) as exc:
+                    print_watch_error(changed, exc)
+                    changed.clear()
+                    continue
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                print(
+                    f"[{time.strftime('%H:%M:%S')}] {', '.join(sorted(changed))}: {summary} in {elapsed_ms:.0f} ms",
+                    flush=True,
+                )
+                changed.clear()
+                search_due = now + settle
+            elif search_due is not None and now >= search_due:
+                search_due = None
+                try:
+                    with METRICS.stage("search"):
+                        write_search_index(cache)
+                    with METRICS.stage("build_cache"):
+                        save_build_cache(cache)
+                except (OSError, ValueError) as exc:
+                    print_watch_error(set(), exc)
+    except KeyboardInterrupt:
+        if changed or search_due is not None:
+            try:
+                print(regenerate(cache, jobs=jobs))
+            except (OSError, ValueError) as exc:
+                print_watch_error(changed, exc)
 
 
 def main() -> None:
-    entries = build_index_entries()
-    write_notebook_index(entries)
-    write_notebooks_page_list(entries)
-    write_sitemap(entries)
-    write_robots()
+    parser = argparse.ArgumentParser(
+        description="Regenerate the notebook index and its per-year pages, the citation and search indexes, pre-rendered notebook HTML, notebooks.html list, sitemap and robots.txt."
+    )
+    parser.add_argument(
+        "--release",
+        action="store_true",
+        help="Also write compact .min.json siblings of the JSON indexes with .gz/.br copies and print a size report",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=f"Worker processes for parsing changed notebooks (0 = one per core; used from {PARALLEL_MIN_FILES} files up)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Re-parse every notebook instead of reusing {BUILD_CACHE_PATH.relative_to(ROOT).as_posix()} (the cache is still rewritten)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the first build, keep polling notebooks/ and regenerate changed outputs until interrupted",
+    )
+    parser.add_argument("--interval", type=float, default=0.2, help="Seconds between --watch polls")
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.2,
+        help="Seconds a burst of changes must be quiet before --watch regenerates",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=3.0,
+        help="Seconds without changes before --watch rewrites the search index and build cache",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write stage timings, cache hits, bytes read and files written as JSON to PATH and print a summary",
+    )
+    args = parser.parse_args()
+
+    with METRICS.recording("generate_notebook_index.py", args.metrics):
+        with METRICS.stage("load_cache"):
+            cache = {} if args.no_cache else load_build_cache()
+        print(regenerate(cache, jobs=args.jobs, release=args.release), flush=True)
+        if args.watch:
+            watch(cache, args.jobs, args.interval, args.debounce, args.settle)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,463 @@
+"""
+Minimal Markdown to HTML renderer for pre-rendering notebooks at build time.
+
+Covers what marked renders for the notebooks with its GFM defaults: ATX and
+setext headings, paragraphs, fenced and indented code, block quotes, nested
+bullet, numbered and task lists, tables, rules, raw HTML blocks, links, images,
+bare URL and email autolinks, code spans, emphasis, strikethrough and hard line
+breaks. Math is handled like the marked extensions in notebook-viewer.html:
+\\begin{align}-style environments become <div class="math-display">, $...$
+that looks like math becomes <span class="math-inline">\\(...\\)</span>, and
+$$...$$, \\[...\\] and \\(...\\) pass through untouched for MathJax. Anything
+else is left to marked: is_supported() is False for text using it.
+Stdlib-only like the scripts using it.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from html import escape
+from typing import Any
+
+
+FENCE_RE = re.compile(r"^\s{0,3}(`{3,}|~{3,})\s*([\w+#.-]*)")
+HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})(?:\s+(.*?))?\s*#*\s*$")
+RULE_RE = re.compile(r"^\s{0,3}(?:(?:\*\s*){3,}|(?:-\s*){3,}|(?:_\s*){3,})$")
+HTML_BLOCK_RE = re.compile(r"^\s{0,3}<(?:!--|/?[A-Za-z][\w-]*(?:\s|/?>|$))")
+TEX_ENV_RE = re.compile(r"^\\begin\{(align\*?|equation\*?|gather\*?|multline\*?)\}\s*$")
+LIST_ITEM_RE = re.compile(r"^(\s*)([-*+]|\d{1,9}[.)])(\s+|$)(.*)$")
+QUOTE_RE = re.compile(r"^\s{0,3}> ?(.*)$")
+INDENTED_CODE_RE = re.compile(r"^ {4}")
+SETEXT_RE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+TABLE_ALIGN_RE = re.compile(r"^(:?)-+(:?)$")
+TABLE_PIPE_RE = re.compile(r"(?<!\\)\|")
+TASK_RE = re.compile(r"^\[([ xX])\](?:\s+|$)")
+# Reference-style link definitions; notebooks using them are rendered by marked in the viewer.
+UNSUPPORTED_RE = re.compile(r"^\s{0,3}\[[^\]\n]+\]:\s*\S", re.MULTILINE)
+
+INLINE_TOKEN_RE = re.compile(
+    r"(?P<code>(?P<ticks>`+)(?P<code_text>.+?)(?P=ticks))"
+    r"|(?P<display>\$\$.+?\$\$|\\\[.+?\\\]|\\\(.+?\\\))"
+    r"|(?P<math>\$(?!\$)(?P<math_text>[^\n$]+?)\$)"
+    r"|(?P<image>!\[(?P<alt>[^\]]*)\]\(\s*(?P<src>(?:[^\s()]|\([^\s()]*\))+)(?:\s+\"(?P<img_title>[^\"]*)\")?\s*\))"
+    r"|(?P<link>\[(?P<link_text>(?:[^\[\]]|\[[^\]]*\])*)\]\(\s*(?P<href>(?:[^\s()]|\([^\s()]*\))*)(?:\s+\"(?P<link_title>[^\"]*)\")?\s*\))"
+    r"|(?P<autolink><(?P<url>https?://[^>\s]+)>)"
+    r"|(?P<html></?[A-Za-z][\w-]*(?:\s+[^<>]*?)?/?>|<!--.*?-->)"
+    r"|(?P<bare_url>(?:(?:https?|ftp)://|www\.)(?:[A-Za-z0-9-]+\.?)+[^\s<]*)"
+    r"|(?P<email>(?<![A-Za-z0-9._+-])[A-Za-z0-9._+-]+@[A-Za-z0-9_-]+(?:\.[A-Za-z0-9_-]*[A-Za-z0-9])+(?![-_]))"
+    r"|(?P<hard_break>\\\n)"
+    r"|(?P<escape>\\[\\`*_{}\[\]()#+\-.!$<>])",
+    re.DOTALL,
+)
+DELIMITER_RUN_RE = re.compile(r"\*+|_+")
+DEL_RE = re.compile(r"(?<!~)(~~?)(?=[^\s~])(.+?)(?<=[^\s~])\1(?!~)")
+# Trailing punctuation is not part of a bare URL; same rule as marked's backpedal.
+URL_BACKPEDAL_RE = re.compile(r"""(?:[^?!.,:;*_'"~()&]+|\([^)]*\)|&(?![a-zA-Z0-9]+;$)|[?!.,:;*_'"~)]+(?!$))+""")
+ENTITY_RE = re.compile(r"&amp;(#[0-9]{1,7}|#[xX][0-9a-fA-F]{1,6}|[A-Za-z][A-Za-z0-9]{1,31});")
+PLACEHOLDER_RE = re.compile("\x00(\\d+)\x00")
+
+
+def is_probably_inline_math(text: str) -> bool:
+    # Same heuristic as isProbablyInlineMath() in notebook-viewer.html.
+    if not text or re.fullmatch(r"[0-9][0-9,.\s]*", text):
+        return False
+    if re.search(r"[\\_^{}]", text) or re.fullmatch(r"[A-Za-z]", text):
+        return True
+    return bool(re.search(r"[A-Za-z]", text) and re.search(r"[=<>+\-*/]", text))
+
+
+def is_supported(text: str) -> bool:
+    """False if `text` uses Markdown this renderer does not handle and marked should render it instead."""
+    return not UNSUPPORTED_RE.search(text)
+
+
+def bare_url(text: str) -> str:
+    """The part of a bare URL match marked links: trailing punctuation and an unmatched ")" are dropped."""
+    while True:
+        match = URL_BACKPEDAL_RE.match(text)
+        trimmed = match.group(0) if match else ""
+        if trimmed == text:
+            return text
+        text = trimmed
+
+
+def _char_class(char: str) -> str:
+    if not char or char.isspace():
+        return "space"
+    # Placeholders stand for code, links and tags, which count as punctuation.
+    if char == "\x00" or unicodedata.category(char)[0] in "PS":
+        return "punct"
+    return "other"
+
+
+def render_emphasis(text: str) -> str:
+    """
+    <em> and <strong> from * and _ delimiter runs, matched the way CommonMark
+    (and so marked) does: flanking rules, the rule of three and closers
+    pairing with the nearest opener, so ***a** b* and ***a* b** nest properly.
+    """
+    parts: list[Any] = []
+    runs: list[dict[str, Any]] = []
+    pos = 0
+    for match in DELIMITER_RUN_RE.finditer(text):
+        before = _char_class(text[match.start() - 1] if match.start() else "")
+        after = _char_class(text[match.end()] if match.end() < len(text) else "")
+        left = after != "space" and (after != "punct" or before != "other")
+        right = before != "space" and (before != "punct" or after != "other")
+        char = match.group()[0]
+        if char == "*":
+            can_open, can_close = left, right
+        else:
+            can_open = left and (not right or before == "punct")
+            can_close = right and (not left or after == "punct")
+        run = {
+            "char": char,
+            "count": len(match.group()),
+            "length": len(match.group()),
+            "open": can_open,
+            "close": can_close,
+            "closing_tags": [],
+            "opening_tags": [],
+        }
+        parts.extend([text[pos:match.start()], run])
+        runs.append(run)
+        pos = match.end()
+    parts.append(text[pos:])
+
+    openers: list[dict[str, Any]] = []
+    for run in runs:
+        while run["close"] and run["count"]:
+            found = None
+            for j in range(len(openers) - 1, -1, -1):
+                opener = openers[j]
+                if opener["char"] != run["char"]:
+                    continue
+                both = opener["close"] or run["open"]
+                if both and (opener["length"] + run["length"]) % 3 == 0 and (opener["length"] % 3 or run["length"] % 3):
+                    continue
+                found = j
+                break
+            if found is None:
+                break
+            opener = openers[found]
+            # Runs between the pair can no longer open anything.
+            del openers[found + 1:]
+            used = 2 if opener["count"] >= 2 and run["count"] >= 2 else 1
+            tag = "strong" if used == 2 else "em"
+            opener["count"] -= used
+            run["count"] -= used
+            opener["opening_tags"].insert(0, f"<{tag}>")
+            run["closing_tags"].append(f"</{tag}>")
+            if not opener["count"]:
+                openers.pop()
+        if run["open"] and run["count"]:
+            openers.append(run)
+
+    return "".join(
+        part if isinstance(part, str)
+        else "".join(part["closing_tags"]) + part["char"] * part["count"] + "".join(part["opening_tags"])
+        for part in parts
+    )
+
+
+def render_inline(text: str, in_link: bool = False) -> str:
+    """
+    Inline Markdown to HTML; code, math, links and raw tags are set aside
+    before emphasis is applied. Bare URLs are not linked inside a link's
+    label (`in_link`) or between raw <a> and </a> tags.
+    """
+    kept: list[str] = []
+    in_anchor = [in_link]
+
+    def keep(html: str) -> str:
+        kept.append(html)
+        return f"\x00{len(kept) - 1}\x00"
+
+    def token(match: re.Match[str]) -> str:
+        if match.group("code") is not None:
+            return keep(f"<code>{escape(match.group('code_text').strip())}</code>")
+        if match.group("display") is not None:
+            return keep(escape(match.group("display"), quote=False))
+        if match.group("math") is not None:
+            inner = match.group("math_text")
+            if not is_probably_inline_math(inner):
+                return keep(escape(match.group("math"), quote=False))
+            return keep(f'<span class="math-inline">\\({escape(inner.strip())}\\)</span>')
+        if match.group("image") is not None:
+            title = match.group("img_title")
+            title_attr = f' title="{escape(title)}"' if title else ""
+            return keep(f'<img src="{escape(match.group("src"))}" alt="{escape(match.group("alt"))}"{title_attr}>')
+        if match.group("link") is not None:
+            title = match.group("link_title")
+            title_attr = f' title="{escape(title)}"' if title else ""
+            label = render_inline(match.group("link_text"), in_link=True)
+            return keep(f'<a href="{escape(match.group("href"))}"{title_attr}>{label}</a>')
+        if match.group("autolink") is not None:
+            url = escape(match.group("url"))
+            return keep(f'<a href="{url}">{url}</a>')
+        if match.group("html") is not None:
+            tag = match.group("html")
+            if re.match(r"<a\s", tag, re.IGNORECASE):
+                in_anchor[0] = True
+            elif re.match(r"</a\s*>", tag, re.IGNORECASE):
+                in_anchor[0] = in_link
+            return keep(tag)
+        if match.group("bare_url") is not None:
+            url = bare_url(match.group("bare_url"))
+            # Whatever was trimmed off is ordinary text again.
+            rest = INLINE_TOKEN_RE.sub(token, match.group("bare_url")[len(url):])
+            if in_anchor[0] or not url:
+                return keep(escape(url)) + rest
+            href = "http://" + url if url.startswith("www.") else url
+            return keep(f'<a href="{escape(href)}">{escape(url)}</a>') + rest
+        if match.group("email") is not None:
+            email = match.group("email")
+            if in_anchor[0]:
+                return keep(escape(email))
+            return keep(f'<a href="mailto:{escape(email)}">{escape(email)}</a>')
+        if match.group("hard_break") is not None:
+            return keep("<br>\n")
+        return keep(escape(match.group("escape")[1]))
+
+    text = INLINE_TOKEN_RE.sub(token, text)
+    text = ENTITY_RE.sub(r"&\1;", escape(text, quote=False))
+    text = render_emphasis(text)
+    text = DEL_RE.sub(lambda m: f"<del>{m.group(2)}</del>", text)
+    text = re.sub(r" {2,}\n", "<br>\n", text)
+    # Restored fragments can themselves hold placeholders (a link's label).
+    while PLACEHOLDER_RE.search(text):
+        text = PLACEHOLDER_RE.sub(lambda m: kept[int(m.group(1))], text)
+    return text
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+def _starts_block(line: str) -> bool:
+    return bool(
+        HEADING_RE.match(line)
+        or FENCE_RE.match(line)
+        or RULE_RE.match(line)
+        or QUOTE_RE.match(line)
+        or TEX_ENV_RE.match(line.strip())
+        or re.match(r"^\s{0,3}[-*+]\s+\S", line)
+    )
+
+
+def _table_cells(line: str) -> list[str]:
+    row = line.strip()
+    row = row[1:] if row.startswith("|") else row
+    row = row[:-1] if row.endswith("|") and not row.endswith("\\|") else row
+    return [cell.strip().replace("\\|", "|") for cell in TABLE_PIPE_RE.split(row)]
+
+
+def _table_alignments(lines: list[str], i: int) -> list[str] | None:
+    """Column alignments if lines[i] is a table header row followed by its delimiter row, else None."""
+    if i + 1 >= len(lines) or "|" not in lines[i] or "|" not in lines[i + 1]:
+        return None
+    delimiters = _table_cells(lines[i + 1])
+    matches = [TABLE_ALIGN_RE.match(cell) for cell in delimiters]
+    if not all(matches) or len(delimiters) != len(_table_cells(lines[i])):
+        return None
+    names = {(True, False): "left", (False, True): "right", (True, True): "center"}
+    return [names.get((bool(m.group(1)), bool(m.group(2))), "") for m in matches if m]
+
+
+def _parse_table(lines: list[str], start: int, aligns: list[str]) -> tuple[str, int]:
+    """Render the table whose header row is lines[start]; return its HTML and the index after it."""
+
+    def row(cells: list[str], tag: str) -> str:
+        cells = (cells + [""] * len(aligns))[: len(aligns)]
+        out = ["<tr>\n"]
+        for cell, align in zip(cells, aligns):
+            align_attr = f' align="{align}"' if align else ""
+            out.append(f"<{tag}{align_attr}>{render_inline(cell)}</{tag}>\n")
+        return "".join(out) + "</tr>\n"
+
+    html = "<table>\n<thead>\n" + row(_table_cells(lines[start]), "th") + "</thead>\n"
+    i = start + 2
+    body = []
+    while i < len(lines) and lines[i].strip() and not _starts_block(lines[i]) and not HTML_BLOCK_RE.match(lines[i]):
+        body.append(row(_table_cells(lines[i]), "td"))
+        i += 1
+    if body:
+        html += "<tbody>" + "".join(body) + "</tbody>"
+    return html + "</table>\n", i
+
+
+def _parse_list(lines: list[str], start: int) -> tuple[str, int]:
+    """Render the list starting at lines[start]; return its HTML and the index after it."""
+    first = LIST_ITEM_RE.match(lines[start])
+    assert first is not None
+    indent = len(first.group(1))
+    ordered = first.group(2)[0].isdigit()
+    items: list[list[str]] = []
+    loose = False
+    i = start
+    while i < len(lines):
+        match = LIST_ITEM_RE.match(lines[i])
+        if match and len(match.group(1)) == indent and match.group(2)[0].isdigit() == ordered:
+            content_offset = indent + len(match.group(2)) + max(1, min(len(match.group(3)), 4))
+            items.append([match.group(4)])
+            i += 1
+            while i < len(lines):
+                line = lines[i]
+                if not line.strip():
+                    j = i
+                    while j < len(lines) and not lines[j].strip():
+                        j += 1
+                    if j < len(lines) and _indent(lines[j]) > indent:
+                        items[-1].extend([""] * (j - i))
+                        loose = loose or not LIST_ITEM_RE.match(lines[j])
+                        i = j
+                        continue
+                    next_item = LIST_ITEM_RE.match(lines[j]) if j < len(lines) else None
+                    if next_item and len(next_item.group(1)) == indent and next_item.group(2)[0].isdigit() == ordered:
+                        loose = True
+                        i = j
+                    break
+                if _indent(line) > indent:
+                    items[-1].append(line[min(_indent(line), content_offset):])
+                elif LIST_ITEM_RE.match(line) or _starts_block(line):
+                    break
+                else:
+                    items[-1].append(line.strip())
+                i += 1
+            continue
+        break
+
+    tag = "ol" if ordered else "ul"
+    number = int(first.group(2)[:-1]) if ordered else 1
+    start_attr = f' start="{number}"' if ordered and number != 1 else ""
+    rendered = [_render_list_item(item, tight=not loose) for item in items]
+    return f"<{tag}{start_attr}>\n" + "\n".join(rendered) + f"\n</{tag}>\n", i
+
+
+def _render_list_item(item: list[str], tight: bool) -> str:
+    task = TASK_RE.match(item[0]) if item else None
+    if task is None:
+        return f"<li>{render_blocks(item, tight=tight).strip()}</li>"
+    checked = ' checked=""' if task.group(1) != " " else ""
+    checkbox = f'<input{checked} disabled="" type="checkbox"> '
+    body = render_blocks([item[0][task.end():]] + item[1:], tight=tight).strip()
+    if body.startswith("<p>"):
+        return f"<li><p>{checkbox}{body[3:]}</li>"
+    return f"<li>{checkbox}{body}</li>"
+
+
+def render_blocks(lines: list[str], tight: bool = False) -> str:
+    """Block-level Markdown to HTML; with tight=True paragraphs are not wrapped in <p> (tight list items)."""
+    out: list[str] = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+
+        # Indented code can't interrupt a paragraph, which is consumed whole below.
+        if INDENTED_CODE_RE.match(line):
+            body = []
+            while i < len(lines) and (INDENTED_CODE_RE.match(lines[i]) or not lines[i].strip()):
+                body.append(lines[i][4:])
+                i += 1
+            while body and not body[-1].strip():
+                body.pop()
+            out.append(f"<pre><code>{escape(chr(10).join(body) + chr(10), quote=False)}</code></pre>\n")
+            continue
+
+        fence = FENCE_RE.match(line)
+        if fence:
+            marker = fence.group(1)
+            lang = fence.group(2)
+            body = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(marker):
+                body.append(lines[i])
+                i += 1
+            i += 1
+            class_attr = f' class="language-{escape(lang)}"' if lang else ""
+            code = escape("\n".join(body) + "\n" if body else "", quote=False)
+            out.append(f"<pre><code{class_attr}>{code}</code></pre>\n")
+            continue
+
+        env = TEX_ENV_RE.match(stripped)
+        if env:
+            end = f"\\end{{{env.group(1)}}}"
+            body = [stripped]
+            i += 1
+            while i < len(lines) and lines[i].strip() != end:
+                body.append(lines[i])
+                i += 1
+            if i < len(lines):
+                body.append(end)
+                i += 1
+            out.append(f'<div class="math-display">{escape(chr(10).join(body).strip())}</div>\n')
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{render_inline(heading.group(2) or '')}</h{level}>\n")
+            i += 1
+            continue
+
+        if RULE_RE.match(line):
+            out.append("<hr>\n")
+            i += 1
+            continue
+
+        if QUOTE_RE.match(line):
+            quoted = []
+            while i < len(lines) and lines[i].strip():
+                match = QUOTE_RE.match(lines[i])
+                quoted.append(match.group(1) if match else lines[i])
+                i += 1
+            out.append(f"<blockquote>\n{render_blocks(quoted)}</blockquote>\n")
+            continue
+
+        if LIST_ITEM_RE.match(line):
+            html, i = _parse_list(lines, i)
+            out.append(html)
+            continue
+
+        if HTML_BLOCK_RE.match(line):
+            block = []
+            while i < len(lines) and lines[i].strip():
+                block.append(lines[i])
+                i += 1
+            out.append("\n".join(block) + "\n")
+            continue
+
+        aligns = _table_alignments(lines, i)
+        if aligns is not None:
+            html, i = _parse_table(lines, i, aligns)
+            out.append(html)
+            continue
+
+        # Keep trailing spaces: two of them end a line with <br>.
+        paragraph = [line.lstrip()]
+        i += 1
+        setext = None
+        while i < len(lines) and lines[i].strip():
+            setext = SETEXT_RE.match(lines[i])
+            if setext or _starts_block(lines[i]) or _table_alignments(lines, i) is not None:
+                break
+            paragraph.append(lines[i].lstrip())
+            i += 1
+        text = "\n".join(paragraph).rstrip()
+        if setext:
+            level = 1 if setext.group(1)[0] == "=" else 2
+            out.append(f"<h{level}>{render_inline(text.strip())}</h{level}>\n")
+            i += 1
+            continue
+        text = render_inline(text)
+        out.append(f"{text}\n" if tight else f"<p>{text}</p>\n")
+    return "".join(out)
+
+
+def render_markdown(text: str) -> str:
+    return render_blocks(text.replace("\r\n", "\n").replace("\t", "    ").split("\n"))
@@ -0,0 +1,145 @@
+"""
+Full-text search index for the notebooks.
+
+generate_notebook_index.py counts the terms of each notebook with
+term_counts(); build_search_index() turns those counts into an inverted
+index with the statistics BM25 needs, split into shards by term prefix so
+notebooks.html only fetches the shards a query's terms fall into. The page
+tokenizes and stems queries itself, so keep searchTerms() and stemTerm() in
+notebooks.html in step with tokenize() and stem() here.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Iterable
+
+from site_outputs import dumps_compact
+
+
+SEARCH_INDEX_VERSION = 1
+
+COMBINING_RE = re.compile("[\u0300-\u036f]")
+MARKUP_RE = re.compile(r"\]\([^)]*\)|<[^>]+>|https?://\S+")
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+ALPHA_RE = re.compile(r"^[a-z]+$")
+
+MIN_TOKEN_LEN = 2
+MAX_TOKEN_LEN = 32
+MIN_STEM_LEN = 3
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its not of on or "
+    "that the their this to was we were which will with".split()
+)
+
+# Tried in order; the first suffix that leaves at least MIN_STEM_LEN characters wins.
+STEM_SUFFIXES = (
+    ("ational", "ate"),
+    ("ization", "ize"),
+    ("fulness", "ful"),
+    ("iveness", "ive"),
+    ("ousness", "ous"),
+    ("sses", "ss"),
+    ("ies", "y"),
+    ("ing", ""),
+    ("edly", ""),
+    ("ed", ""),
+    ("ly", ""),
+    ("s", ""),
+)
+KEEP_S_ENDINGS = ("ss", "us", "is")
+
+# Shards larger than this are split by one more prefix character, up to MAX_PREFIX_LEN.
+SHARD_TARGET_BYTES = 32 * 1024
+MAX_PREFIX_LEN = 4
+
+
+def stem(token: str) -> str:
+    if not ALPHA_RE.match(token):
+        return token
+    for suffix, replacement in STEM_SUFFIXES:
+        if not token.endswith(suffix) or len(token) - len(suffix) < MIN_STEM_LEN:
+            continue
+        if suffix == "s" and token.endswith(KEEP_S_ENDINGS):
+            return token
+        return token[: -len(suffix)] + replacement
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Index terms of `text` in order: accent-folded, lower-cased, stop words dropped, stemmed."""
+    folded = COMBINING_RE.sub("", unicodedata.normalize("NFKD", text)).lower()
+    terms = []
+    for token in TOKEN_RE.findall(MARKUP_RE.sub(" ", folded)):
+        if MIN_TOKEN_LEN <= len(token) <= MAX_TOKEN_LEN and token not in STOPWORDS:
+            terms.append(stem(token))
+    return terms
+
+
+def term_counts(text: str) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for term in tokenize(text):
+        counts[term] = counts.get(term, 0) + 1
+    return counts
+
+
+def _shard_prefixes(postings: dict[str, list[int]]) -> dict[str, str]:
+    """
+    Shard prefix for every term: its first character, lengthened one
+    character at a time for shards over SHARD_TARGET_BYTES. A term no longer
+    than a split prefix gets a shard of its own, so no prefix is ever both a
+    shard and the start of a longer one.
+    """
+    sizes = {term: len(term) + 4 * len(plist) + 6 for term, plist in postings.items()}
+    prefixes = {term: term[:1] for term in postings}
+    for length in range(2, MAX_PREFIX_LEN + 1):
+        totals: dict[str, int] = {}
+        for term, prefix in prefixes.items():
+            totals[prefix] = totals.get(prefix, 0) + sizes[term]
+        split = {prefix for prefix, total in totals.items() if total > SHARD_TARGET_BYTES and len(prefix) == length - 1}
+        if not split:
+            break
+        for term, prefix in prefixes.items():
+            if prefix in split:
+                prefixes[term] = term[:length]
+    return prefixes
+
+
+def build_search_index(docs: Iterable[tuple[str, dict[str, int]]]) -> tuple[dict[str, Any], dict[str, dict[str, list[int]]]]:
+    """
+    Manifest and shards for (path, term counts) `docs`.
+
+    The manifest lists every document as [path, length] (its position is its
+    id), the average length, and each shard's prefix with a content hash for
+    cache busting. A shard maps each of its terms to a flat postings list
+    [doc id delta, term frequency, ...] in ascending doc id order.
+    """
+    doc_list: list[list[Any]] = []
+    postings: dict[str, list[int]] = {}
+    last_doc: dict[str, int] = {}
+    for doc_id, (path, counts) in enumerate(docs):
+        doc_list.append([path, sum(counts.values())])
+        for term, tf in counts.items():
+            plist = postings.setdefault(term, [])
+            plist.extend((doc_id - last_doc.get(term, 0), tf))
+            last_doc[term] = doc_id
+
+    prefixes = _shard_prefixes(postings)
+    shards: dict[str, dict[str, list[int]]] = {}
+    for term in sorted(postings):
+        shards.setdefault(prefixes[term], {})[term] = postings[term]
+
+    total = sum(length for _, length in doc_list)
+    manifest = {
+        "version": SEARCH_INDEX_VERSION,
+        "avgdl": round(total / len(doc_list), 3) if doc_list else 0,
+        "docs": doc_list,
+        "shards": {
+            prefix: hashlib.sha256(dumps_compact(shard).encode("utf-8")).hexdigest()[:16]
+            for prefix, shard in sorted(shards.items())
+        },
+    }
+    return manifest, shards
@@ -0,0 +1,272 @@
+"""
+Shared output helpers for the site build scripts.
+
+Stdlib-only like the scripts that import it. Brotli siblings are written only
+when the optional `brotli` package happens to be installed. Every write goes to
+a temp file in the target directory first and is renamed into place, so an
+interrupted build never leaves a truncated output behind. Written and
+unchanged files are counted in build_metrics.METRICS.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Any, Iterable
+
+from build_metrics import METRICS
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:
+    brotli = None
+
+
+def open_atomic(path: Path) -> IO[bytes]:
+    """Open a temp file next to `path`; pass it to commit_atomic() or discard_atomic()."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return tempfile.NamedTemporaryFile(
+        mode="wb", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    )
+
+
+def _target_mode(path: Path) -> int:
+    # NamedTemporaryFile creates 0600; keep the target's mode, or give new
+    # files what a plain open() would.
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def commit_atomic(handle: IO[bytes], path: Path) -> None:
+    handle.flush()
+    os.fsync(handle.fileno())
+    os.chmod(handle.fileno(), _target_mode(path))
+    METRICS.count("files_written")
+    METRICS.count("bytes_out", handle.tell())
+    handle.close()
+    os.replace(handle.name, path)
+
+
+def discard_atomic(handle: IO[bytes]) -> None:
+    handle.close()
+    try:
+        os.unlink(handle.name)
+    except FileNotFoundError:
+        pass
+
+
+def write_bytes_atomic(path: Path, content: bytes) -> None:
+    handle = open_atomic(path)
+    try:
+        handle.write(content)
+    except BaseException:
+        discard_atomic(handle)
+        raise
+    commit_atomic(handle, path)
+
+
+def write_bytes_if_changed(path: Path, content: bytes) -> bool:
+    """Write `content` unless `path` already holds exactly these bytes; return whether it wrote."""
+    try:
+        if path.stat().st_size == len(content) and path.read_bytes() == content:
+            METRICS.count("files_unchanged")
+            return False
+    except FileNotFoundError:
+        pass
+    write_bytes_atomic(path, content)
+    return True
+
+
+def write_text_if_changed(path: Path, content: str) -> bool:
+    return write_bytes_if_changed(path, content.encode("utf-8"))
+
+
+def dumps_compact(payload: Any, ensure_ascii: bool = False) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=ensure_ascii)
+
+
+def compact_path(path: Path) -> Path:
+    # library-items.json -> library-items.min.json
+    return path.with_name(f"{path.stem}.min{path.suffix}")
+
+
+def write_compressed_siblings(path: Path, content: bytes) -> dict[str, int]:
+    """Write `path`.gz (and `path`.br when brotli is available) holding `content`; return their sizes."""
+    # mtime=0 keeps the .gz byte-identical across runs with identical input.
+    gz = gzip.compress(content, compresslevel=9, mtime=0)
+    write_bytes_if_changed(path.with_name(path.name + ".gz"), gz)
+    sizes = {"gzip": len(gz)}
+
+    if brotli is not None:
+        br = brotli.compress(content, quality=11)
+        write_bytes_if_changed(path.with_name(path.name + ".br"), br)
+        sizes["brotli"] = len(br)
+    return sizes
+
+
+def write_release_variants(path: Path, payload: Any, ensure_ascii: bool = False) -> dict[str, int]:
+    """
+    Write the compact JSON sibling of `path` plus precompressed .gz/.br copies
+    of it, and return the byte size of every variant (including the pretty
+    file at `path`, which the caller has already written).
+    """
+    compact = dumps_compact(payload, ensure_ascii=ensure_ascii).encode("utf-8")
+    min_path = compact_path(path)
+    write_bytes_if_changed(min_path, compact)
+
+    sizes = {
+        "pretty": path.stat().st_size if path.exists() else 0,
+        "compact": len(compact),
+    }
+    sizes.update(write_compressed_siblings(min_path, compact))
+    return sizes
+
+
+def _indent_json(value: Any, ensure_ascii: bool, level: int) -> str:
+    text = json.dumps(value, indent=4, ensure_ascii=ensure_ascii)
+    return text.replace("\n", "\n" + "    " * level)
+
+
+class JsonObjectWriter:
+    """
+    Stream a top-level JSON object to `path` one field at a time, in the same
+    layout json.dump(indent=4) produces, so arrays can be fed from a generator
+    instead of a list held in memory.
+
+    Output goes to a temp file that commit() renames into place; abort() (or
+    leaving the `with` block on an exception) deletes it and leaves any
+    existing `path` untouched. With `compact=True` a separator-free copy is
+    streamed to the .min sibling alongside. Fields written with hashed=True
+    also feed `digest`, a hash of their canonical (sorted, compact) form.
+    """
+
+    def __init__(self, path: Path, compact: bool = False, ensure_ascii: bool = False) -> None:
+        self.path = path
+        self.ensure_ascii = ensure_ascii
+        self._pretty = open_atomic(path)
+        self._compact = open_atomic(compact_path(path)) if compact else None
+        self._hash = hashlib.sha256()
+        self._fields = 0
+        self._write(b"{", b"{")
+
+    def __enter__(self) -> "JsonObjectWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *_: Any) -> None:
+        if exc_type is not None:
+            self.abort()
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()[:16]
+
+    def _write(self, pretty: bytes, compact: bytes) -> None:
+        self._pretty.write(pretty)
+        if self._compact is not None:
+            self._compact.write(compact)
+
+    def _canonical(self, value: Any) -> bytes:
+        return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def _key(self, key: str) -> None:
+        sep = b"," if self._fields else b""
+        name = json.dumps(key, ensure_ascii=self.ensure_ascii).encode("utf-8")
+        self._write(sep + b"\n    " + name + b": ", sep + name + b":")
+        self._fields += 1
+
+    def field(self, key: str, value: Any, hashed: bool = True) -> None:
+        self._key(key)
+        self._write(
+            _indent_json(value, self.ensure_ascii, 1).encode("utf-8"),
+            dumps_compact(value, ensure_ascii=self.ensure_ascii).encode("utf-8"),
+        )
+        if hashed:
+            self._hash.update(self._canonical(key) + b":" + self._canonical(value) + b"\n")
+
+    def array_field(self, key: str, values: Iterable[Any], hashed: bool = True) -> int:
+        """Write `key` as an array drawn from `values` one element at a time; return its length."""
+        self._key(key)
+        self._write(b"[", b"[")
+        if hashed:
+            self._hash.update(self._canonical(key) + b":[")
+        count = 0
+        for value in values:
+            sep = b"," if count else b""
+            self._write(
+                sep + b"\n        " + _indent_json(value, self.ensure_ascii, 2).encode("utf-8"),
+                sep + dumps_compact(value, ensure_ascii=self.ensure_ascii).encode("utf-8"),
+            )
+            if hashed:
+                self._hash.update(self._canonical(value) + b",")
+            count += 1
+        self._write(b"\n    ]" if count else b"]", b"]")
+        if hashed:
+            self._hash.update(b"]\n")
+        return count
+
+    def object_field(self, key: str, pairs: Iterable[tuple[str, Any]], hashed: bool = True) -> int:
+        """Write `key` as an object drawn from (name, value) `pairs` one at a time; return its size."""
+        self._key(key)
+        self._write(b"{", b"{")
+        if hashed:
+            self._hash.update(self._canonical(key) + b":{")
+        count = 0
+        for name, value in pairs:
+            sep = b"," if count else b""
+            encoded_name = json.dumps(name, ensure_ascii=self.ensure_ascii).encode("utf-8")
+            self._write(
+                sep + b"\n        " + encoded_name + b": " + _indent_json(value, self.ensure_ascii, 2).encode("utf-8"),
+                sep + encoded_name + b":" + dumps_compact(value, ensure_ascii=self.ensure_ascii).encode("utf-8"),
+            )
+            if hashed:
+                self._hash.update(self._canonical(name) + b":" + self._canonical(value) + b",")
+            count += 1
+        self._write(b"\n    }" if count else b"}", b"}")
+        if hashed:
+            self._hash.update(b"}\n")
+        return count
+
+    def commit(self) -> None:
+        self._write(b"\n}\n" if self._fields else b"}\n", b"}")
+        commit_atomic(self._pretty, self.path)
+        if self._compact is not None:
+            commit_atomic(self._compact, compact_path(self.path))
+
+    def abort(self) -> None:
+        discard_atomic(self._pretty)
+        if self._compact is not None:
+            discard_atomic(self._compact)
+
+
+def format_size_report(rows: list[tuple[str, dict[str, int]]]) -> str:
+    def pct(part: int, whole: int) -> str:
+        return f"{100.0 * part / whole:5.1f}%" if whole else "    -"
+
+    lines = [f"{'output':<40} {'pretty':>10} {'compact':>10} {'gzip':>10} {'brotli':>10}"]
+    totals: dict[str, int] = {}
+    for label, sizes in rows:
+        for name, size in sizes.items():
+            totals[name] = totals.get(name, 0) + size
+        lines.append(
+            f"{label:<40} {sizes.get('pretty', 0):>10} {sizes.get('compact', 0):>10} "
+            f"{sizes.get('gzip', 0):>10} {sizes.get('brotli', '-'):>10}"
+        )
+    if len(rows) > 1:
+        lines.append(
+            f"{'total':<40} {totals.get('pretty', 0):>10} {totals.get('compact', 0):>10} "
+            f"{totals.get('gzip', 0):>10} {totals.get('brotli', '-'):>10}"
+        )
+    pretty = totals.get("pretty", 0)
+    lines.append(
+        f"compact is {pct(totals.get('compact', 0), pretty)} of pretty, gzip {pct(totals.get('gzip', 0), pretty)}"
+        + (f", brotli {pct(totals['brotli'], pretty)}" if "brotli" in totals else " (brotli not installed; .br skipped)")
+    )
+    return "\n".join(lines)
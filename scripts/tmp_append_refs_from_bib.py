@@ -18,6 +18,8 @@ import re
 from pathlib import Path
 from typing import Any
 
+from build_metrics import METRICS
+
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -274,31 +276,45 @@ def main() -> int:
         default="/Users/jonatanwachter/MSc/MScThesis/thesis_template/refs.bib",
         help="BibTeX file (refs.bib)",
     )
+    parser.add_argument("--metrics", metavar="PATH", help="Write stage timings and byte counts as JSON to PATH and print a summary")
     args = parser.parse_args()
 
-    nb_path = Path(args.notebook).expanduser().resolve()
-    bib_path = Path(args.bib).expanduser().resolve()
-
-    nb_text = nb_path.read_text(encoding="utf-8")
-    fm, body = split_frontmatter(nb_text)
-    if not fm:
-        raise SystemExit(f"Notebook missing YAML frontmatter: {nb_path}")
-
-    body_no_block = strip_existing_block(body)
-    cite_keys = extract_cite_keys(body_no_block)
-
-    bib_text = bib_path.read_text(encoding="utf-8", errors="replace")
-    bib_entries = parse_bibtex_entries(bib_text)
-
-    key_to_num = {k: i for i, k in enumerate(cite_keys, start=1)}
-    key_to_anchor = {k: f"ref-{_slugify_id(k)}" for k in cite_keys}
-    linked_body = rewrite_cites_as_links(body_no_block, key_to_num, key_to_anchor)
-
-    block = build_references_block(cite_keys, bib_entries, key_to_anchor)
-    new_body = linked_body.rstrip() + "\n\n" + block
-    # Preserve the notebook's conventional single blank line after frontmatter.
-    # (Other notes in this repo use: frontmatter, blank line, then H1.)
-    nb_path.write_text(fm + new_body, encoding="utf-8")
+    with METRICS.recording("tmp_append_refs_from_bib.py", args.metrics):
+        nb_path = Path(args.notebook).expanduser().resolve()
+        bib_path = Path(args.bib).expanduser().resolve()
+
+        with METRICS.stage("read"):
+            nb_text = nb_path.read_text(encoding="utf-8")
+        METRICS.count("bytes_in", len(nb_text.encode("utf-8")))
+        fm, body = split_frontmatter(nb_text)
+        if not fm:
+            raise SystemExit(f"Notebook missing YAML frontmatter: {nb_path}")
+
+        body_no_block = strip_existing_block(body)
+        cite_keys = extract_cite_keys(body_no_block)
+        METRICS.count("cite_keys", len(cite_keys))
+
+        with METRICS.stage("read"):
+            bib_text = bib_path.read_text(encoding="utf-8", errors="replace")
+        METRICS.count("bytes_in", len(bib_text.encode("utf-8")))
+        with METRICS.stage("parse_bib"):
+            bib_entries = parse_bibtex_entries(bib_text)
+        METRICS.count("bib_entries", len(bib_entries))
+
+        with METRICS.stage("references"):
+            key_to_num = {k: i for i, k in enumerate(cite_keys, start=1)}
+            key_to_anchor = {k: f"ref-{_slugify_id(k)}" for k in cite_keys}
+            linked_body = rewrite_cites_as_links(body_no_block, key_to_num, key_to_anchor)
+
+            block = build_references_block(cite_keys, bib_entries, key_to_anchor)
+            new_body = linked_body.rstrip() + "\n\n" + block
+        # Preserve the notebook's conventional single blank line after frontmatter.
+        # (Other notes in this repo use: frontmatter, blank line, then H1.)
+        output = fm + new_body
+        with METRICS.stage("write"):
+            nb_path.write_text(output, encoding="utf-8")
+        METRICS.count("files_written")
+        METRICS.count("bytes_out", len(output.encode("utf-8")))
     return 0
 
 
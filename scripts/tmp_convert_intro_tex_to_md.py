@@ -18,6 +18,8 @@ import re
 import textwrap
 from pathlib import Path
 
+from build_metrics import METRICS
+
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -287,24 +289,34 @@ def main() -> int:
         default=str(ROOT / "notebooks" / "2026-02-09-msc-thesis-introduction.md"),
         help="Notebook Markdown file to write into (frontmatter preserved)",
     )
+    parser.add_argument("--metrics", metavar="PATH", help="Write stage timings and byte counts as JSON to PATH and print a summary")
     args = parser.parse_args()
 
-    tex_path = Path(args.tex).expanduser().resolve()
-    nb_path = Path(args.notebook).expanduser().resolve()
-
-    tex = tex_path.read_text(encoding="utf-8")
-    md_body = convert_tex_to_markdown(tex)
-
-    nb_text = nb_path.read_text(encoding="utf-8")
-    frontmatter, _ = split_frontmatter(nb_text)
-    if not frontmatter:
-        raise SystemExit(f"Notebook missing YAML frontmatter: {nb_path}")
-
-    new_nb = frontmatter
-    new_nb += "\n# MSc thesis introduction\n\n"
-    new_nb += md_body
-
-    nb_path.write_text(new_nb, encoding="utf-8")
+    with METRICS.recording("tmp_convert_intro_tex_to_md.py", args.metrics):
+        tex_path = Path(args.tex).expanduser().resolve()
+        nb_path = Path(args.notebook).expanduser().resolve()
+
+        with METRICS.stage("read"):
+            tex = tex_path.read_text(encoding="utf-8")
+        METRICS.count("bytes_in", len(tex.encode("utf-8")))
+        with METRICS.stage("convert"):
+            md_body = convert_tex_to_markdown(tex)
+
+        with METRICS.stage("read"):
+            nb_text = nb_path.read_text(encoding="utf-8")
+        METRICS.count("bytes_in", len(nb_text.encode("utf-8")))
+        frontmatter, _ = split_frontmatter(nb_text)
+        if not frontmatter:
+            raise SystemExit(f"Notebook missing YAML frontmatter: {nb_path}")
+
+        new_nb = frontmatter
+        new_nb += "\n# MSc thesis introduction\n\n"
+        new_nb += md_body
+
+        with METRICS.stage("write"):
+            nb_path.write_text(new_nb, encoding="utf-8")
+        METRICS.count("files_written")
+        METRICS.count("bytes_out", len(new_nb.encode("utf-8")))
     return 0
 
 
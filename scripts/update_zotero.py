@@ -7,22 +7,71 @@ This is intentionally stdlib-only so it can run in GitHub Actions without instal
 
 from __future__ import annotations
 
+import argparse
 import datetime
+import email.utils
+import gzip
+import hashlib
+import http.client
 import json
 import os
+import random
 import re
 import sys
+import tempfile
+import threading
 import time
 import urllib.parse
-import urllib.request
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
+
+from build_metrics import METRICS
+from citations import normalize_doi
+from site_outputs import (
+    JsonObjectWriter,
+    compact_path,
+    format_size_report,
+    write_bytes_atomic,
+    write_compressed_siblings,
+    write_release_variants,
+    write_text_if_changed,
+)
+from zotero_snapshot import (
+    BIB_DIRNAME,
+    LOOKUP_NAME,
+    MANIFEST_NAME,
+    SHARDS_DIRNAME,
+    PreviousSnapshot,
+    bib_hash,
+    is_valid_style_id,
+    load_json_object,
+    split_bib,
+)
 
 
 ROOT = Path(__file__).resolve().parents[1]
 ZOTERO_CONFIG_PATH = ROOT / "zotero-config.js"
 
 DEFAULT_OUTPUT_PATH = ROOT / "zotero" / "library-items.json"
+DEFAULT_CACHE_DIR = ROOT / ".cache" / "zotero-pages"
+DEFAULT_CACHE_MAX_MB = 200.0
+CACHED_HEADERS = ("last-modified-version", "total-results", "etag")
+# Overridable so the updater can be pointed at a local stand-in (see benchmarks/).
+API_BASE = (os.environ.get("ZOTERO_API_BASE") or "https://api.zotero.org").rstrip("/")
+# Excluded from the content hash: they change on every run (or on changes
+# outside the snapshotted subtree) without the published data changing.
+VOLATILE_SNAPSHOT_FIELDS = {"updated_at", "library_version", "content_hash"}
+FETCH_MODES = {"collections", "group"}
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+DEFAULT_RATE_LIMIT = 8.0  # requests per second, shared by all workers
+DEFAULT_MAX_RETRIES = 5
+RETRY_BASE_DELAY_S = 1.0
+RETRY_MAX_DELAY_S = 60.0
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
 
 GROUP_RE = re.compile(r"\bgroupId\s*:\s*['\"]([^'\"]+)['\"]")
 COLLECTION_RE = re.compile(r"\bcollectionKey\s*:\s*['\"]([^'\"]+)['\"]")
@@ -59,7 +108,7 @@ def is_valid_collection_key(value: str) -> bool:
 
 
 def build_collections_url(group_id: str, start: int, limit: int) -> str:
-    base = f"https://api.zotero.org/groups/{urllib.parse.quote(group_id)}/collections"
+    base = f"{API_BASE}/groups/{urllib.parse.quote(group_id)}/collections"
     qs = {
         "v": "3",
         "format": "json",
@@ -70,7 +119,7 @@ def build_collections_url(group_id: str, start: int, limit: int) -> str:
 
 
 def build_collection_items_url(group_id: str, collection_key: str, style: str, start: int, limit: int) -> str:
-    base = f"https://api.zotero.org/groups/{urllib.parse.quote(group_id)}/collections/{urllib.parse.quote(collection_key)}/items/top"
+    base = f"{API_BASE}/groups/{urllib.parse.quote(group_id)}/collections/{urllib.parse.quote(collection_key)}/items/top"
     qs = {
         "v": "3",
         "format": "json",
@@ -83,17 +132,258 @@ def build_collection_items_url(group_id: str, collection_key: str, style: str, s
     return f"{base}?{urllib.parse.urlencode(qs)}"
 
 
-def fetch_json(url: str, api_key: str = "", timeout_s: int = 30) -> Any:
+def build_group_items_url(
+    group_id: str,
+    style: str,
+    start: int,
+    limit: int,
+    since: int | None = None,
+    include: str = "data,bib",
+) -> str:
+    # Group-wide: one stream covers every collection, and with `since` it also
+    # catches items whose collection membership changed.
+    base = f"{API_BASE}/groups/{urllib.parse.quote(group_id)}/items/top"
+    qs = {
+        "v": "3",
+        "format": "json",
+        "include": include,
+        "style": style,
+        "linkwrap": "1",
+    }
+    if since is not None:
+        # Trashed items must be seen so they can be dropped from the snapshot.
+        qs["since"] = str(since)
+        qs["includeTrashed"] = "1"
+    qs["limit"] = str(limit)
+    qs["start"] = str(start)
+    return f"{base}?{urllib.parse.urlencode(qs)}"
+
+
+def build_deleted_url(group_id: str, since: int) -> str:
+    base = f"{API_BASE}/groups/{urllib.parse.quote(group_id)}/deleted"
+    qs = {
+        "v": "3",
+        "since": str(since),
+    }
+    return f"{base}?{urllib.parse.urlencode(qs)}"
+
+
+class ZoteroApiError(Exception):
+    def __init__(self, code: int, detail: str = "", headers: dict[str, str] | None = None) -> None:
+        super().__init__(f"Zotero API error ({code})")
+        self.code = code
+        self.detail = detail
+        self.headers = headers or {}
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections, one per worker thread and host.
+
+    http.client connections are not thread-safe, so each thread gets its own;
+    a connection the server has closed is reopened once before giving up.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    def _connections(self) -> dict[tuple[str, str], http.client.HTTPConnection]:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = {}
+            self._local.conns = conns
+        return conns
+
+    def _connection(self, scheme: str, netloc: str, timeout_s: float) -> http.client.HTTPConnection:
+        conns = self._connections()
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(netloc, timeout=timeout_s)
+            else:
+                conn = http.client.HTTPConnection(netloc, timeout=timeout_s)
+            conns[(scheme, netloc)] = conn
+        elif conn.sock is not None:
+            conn.sock.settimeout(timeout_s)
+        return conn
+
+    def _discard(self, scheme: str, netloc: str) -> None:
+        conn = self._connections().pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def request(self, url: str, headers: dict[str, str], timeout_s: float = 30) -> tuple[int, dict[str, str], bytes]:
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc, timeout_s)
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                METRICS.count("http_requests")
+                METRICS.count("http_bytes_in", len(body))
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+                # Stale keep-alive connection; retry once on a fresh one.
+                self._discard(parts.scheme, parts.netloc)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self._discard(parts.scheme, parts.netloc)
+                raise
+
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.will_close:
+                self._discard(parts.scheme, parts.netloc)
+            if resp_headers.get("content-encoding", "").strip().lower() == "gzip":
+                body = gzip.decompress(body)
+            return resp.status, resp_headers, body
+
+        raise RuntimeError("unreachable")
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all worker threads.
+
+    pause() blocks every worker until the given delay has elapsed; it is used
+    for Zotero's Backoff header and for Retry-After on throttled responses.
+    """
+
+    def __init__(self, rate_per_s: float = DEFAULT_RATE_LIMIT, burst: int | None = None) -> None:
+        self.rate_per_s = max(rate_per_s, 0.0)
+        self.capacity = float(burst if burst is not None else max(1, int(self.rate_per_s) or 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, delay_s: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + max(delay_s, 0.0))
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait_s = self._paused_until - now
+                if wait_s <= 0:
+                    if self.rate_per_s <= 0:
+                        return
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait_s = (1 - self._tokens) / self.rate_per_s
+            time.sleep(wait_s)
+
+
+def parse_delay_header(value: str | None) -> float | None:
+    """Parse a Backoff/Retry-After value given in seconds or as an HTTP date."""
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        return max(float(text), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max((when - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+
+
+def retry_delay(attempt: int) -> float:
+    # Full jitter keeps concurrent workers from retrying in lockstep.
+    return random.uniform(0, min(RETRY_MAX_DELAY_S, RETRY_BASE_DELAY_S * (2**attempt)))
+
+
+def parse_float(value: str | None, default: float) -> float:
+    try:
+        return float(str(value or "").strip())
+    except ValueError:
+        return default
+
+
+HTTP_POOL = ConnectionPool()
+RATE_LIMITER = RateLimiter(parse_float(os.environ.get("ZOTERO_RATE_LIMIT"), DEFAULT_RATE_LIMIT))
+MAX_RETRIES = int(parse_float(os.environ.get("ZOTERO_MAX_RETRIES"), DEFAULT_MAX_RETRIES))
+
+
+def fetch_json_with_headers(
+    url: str,
+    api_key: str = "",
+    timeout_s: int = 30,
+    extra_headers: dict[str, str] | None = None,
+) -> tuple[Any, dict[str, str]]:
+    """Return (payload, lower-cased response headers); payload is None on 304 Not Modified."""
     headers = {
         "User-Agent": "jswachter.github.io zotero snapshot updater",
         "Accept": "application/json",
+        "Accept-Encoding": "gzip",
     }
     if api_key:
         headers["Zotero-API-Key"] = api_key
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        raw = resp.read()
-    return json.loads(raw.decode("utf-8"))
+    if extra_headers:
+        headers.update(extra_headers)
+
+    attempt = 0
+    while True:
+        RATE_LIMITER.acquire()
+        try:
+            status, resp_headers, raw = HTTP_POOL.request(url, headers, timeout_s=timeout_s)
+        except (OSError, http.client.HTTPException) as exc:
+            if attempt >= MAX_RETRIES:
+                raise
+            delay = retry_delay(attempt)
+            print(f"warning: request failed ({exc}); retrying in {delay:.1f}s", file=sys.stderr)
+            METRICS.count("http_retries")
+            time.sleep(delay)
+            attempt += 1
+            continue
+
+        backoff = parse_delay_header(resp_headers.get("backoff"))
+        if backoff:
+            RATE_LIMITER.pause(backoff)
+
+        if status in RETRYABLE_STATUS and attempt < MAX_RETRIES:
+            retry_after = parse_delay_header(resp_headers.get("retry-after"))
+            delay = retry_after if retry_after is not None else retry_delay(attempt)
+            print(f"warning: Zotero API returned {status}; retrying in {delay:.1f}s", file=sys.stderr)
+            METRICS.count("http_retries")
+            if retry_after is not None:
+                # The server is throttling the client, not just this request.
+                RATE_LIMITER.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+            continue
+
+        if status == 304:
+            METRICS.count("http_not_modified")
+            return None, resp_headers
+        if status >= 300:
+            raise ZoteroApiError(status, raw.decode("utf-8", errors="replace"), resp_headers)
+        return json.loads(raw.decode("utf-8")), resp_headers
+
+
+def fetch_json(url: str, api_key: str = "", timeout_s: int = 30) -> Any:
+    payload, _ = fetch_json_with_headers(url, api_key=api_key, timeout_s=timeout_s)
+    return payload
+
+
+def parse_nonnegative_int(value: Any) -> int | None:
+    try:
+        version = int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    return version if version >= 0 else None
 
 
 KEEP_DATA_FIELDS = {
@@ -110,10 +400,8 @@ KEEP_DATA_FIELDS = {
 
 def compact_item(raw: dict[str, Any]) -> dict[str, Any]:
     data = raw.get("data") if isinstance(raw.get("data"), dict) else {}
-    compact_data: dict[str, Any] = {}
-    for k in KEEP_DATA_FIELDS:
-        if k in data:
-            compact_data[k] = data.get(k)
+    # Keep the API's field order so repeated runs serialize identically.
+    compact_data = {k: v for k, v in data.items() if k in KEEP_DATA_FIELDS}
 
     out: dict[str, Any] = {
         "key": raw.get("key"),
@@ -142,38 +430,815 @@ def compact_collection(raw: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def fetch_paginated(url_builder: Any, api_key: str, page_size: int = 100) -> list[dict[str, Any]]:
-    results: list[dict[str, Any]] = []
-    start = 0
+class PageCache:
+    """
+    On-disk cache of fetched API pages keyed by URL and API key, so a run
+    restarted after a failure reuses every page the failed run completed.
 
-    while True:
-        url = url_builder(start, page_size)
-        batch = fetch_json(url, api_key=api_key)
+    Each entry records the library version (and ETag, if any) it was fetched
+    at. Once update_snapshot() has set `library_version` from the collections
+    request, entries at that version are served without a request; older
+    ones are revalidated with If-Modified-Since-Version / If-None-Match.
+    Hits refresh the entry's mtime, and prune() evicts the least recently
+    used entries beyond `max_bytes`. A max_bytes of 0 disables the cache.
+    """
 
-        if not isinstance(batch, list) or not batch:
-            break
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.start_run()
+
+    def start_run(self) -> None:
+        self.library_version: int | None = None
+        self.stats = {"hits": 0, "revalidated": 0, "stored": 0, "evicted": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _path(self, url: str, api_key: str) -> Path:
+        digest = hashlib.sha256(f"{api_key}\n{url}".encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json.gz"
+
+    def load(self, url: str, api_key: str) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        try:
+            entry = json.loads(gzip.decompress(self._path(url, api_key).read_bytes()))
+        except (OSError, EOFError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("url") != url or not isinstance(entry.get("payload"), list):
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict[str, Any]) -> bool:
+        version = parse_nonnegative_int(entry.get("version"))
+        return version is not None and version == self.library_version
+
+    def validators(self, entry: dict[str, Any]) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        version = parse_nonnegative_int(entry.get("version"))
+        if version is not None:
+            headers["If-Modified-Since-Version"] = str(version)
+        if entry.get("etag"):
+            headers["If-None-Match"] = str(entry["etag"])
+        return headers
+
+    def hit(self, url: str, api_key: str, revalidated: bool = False) -> None:
+        try:
+            os.utime(self._path(url, api_key))
+        except OSError:
+            pass
+        self._count("revalidated" if revalidated else "hits")
+
+    def store(self, url: str, api_key: str, payload: list[dict[str, Any]], headers: dict[str, str]) -> None:
+        version = parse_nonnegative_int(headers.get("last-modified-version"))
+        etag = headers.get("etag")
+        if not self.enabled or (version is None and not etag):
+            return
+        entry = {
+            "url": url,
+            "version": version,
+            "etag": etag,
+            "headers": {k: headers[k] for k in CACHED_HEADERS if k in headers},
+            "payload": payload,
+        }
+        content = gzip.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8"), mtime=0)
+        try:
+            write_bytes_atomic(self._path(url, api_key), content)
+        except OSError as exc:
+            print(f"warning: could not write page cache entry: {exc}", file=sys.stderr)
+            return
+        self._count("stored")
+
+    def prune(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        if not self.enabled or not self.root.is_dir():
+            return
+        entries = []
+        for path in self.root.rglob("*"):
+            if not path.is_file():
+                continue
+            if path.name.startswith("."):
+                # Temp file left by an interrupted write.
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats["evicted"] += 1
+
+
+PAGE_CACHE = PageCache(
+    ROOT / (os.environ.get("ZOTERO_CACHE_DIR") or DEFAULT_CACHE_DIR),
+    int(parse_float(os.environ.get("ZOTERO_CACHE_MAX_MB"), DEFAULT_CACHE_MAX_MB) * 1024 * 1024),
+)
+
+
+def fetch_page(
+    url: str,
+    api_key: str,
+    extra_headers: dict[str, str] | None = None,
+) -> tuple[list[dict[str, Any]] | None, dict[str, str]]:
+    # Caller-supplied conditional headers mean the caller wants to see the 304
+    # itself, so those requests bypass the page cache.
+    cached = PAGE_CACHE.load(url, api_key) if extra_headers is None else None
+    if cached is not None:
+        if PAGE_CACHE.is_fresh(cached):
+            PAGE_CACHE.hit(url, api_key)
+            return cached["payload"], dict(cached.get("headers") or {})
+        extra_headers = PAGE_CACHE.validators(cached)
+
+    batch, headers = fetch_json_with_headers(url, api_key=api_key, extra_headers=extra_headers)
+    if batch is None:
+        if cached is None:
+            return None, headers
+        PAGE_CACHE.hit(url, api_key, revalidated=True)
+        return cached["payload"], {**dict(cached.get("headers") or {}), **{k: headers[k] for k in CACHED_HEADERS if k in headers}}
+    if not isinstance(batch, list):
+        return [], headers
+    batch = [raw for raw in batch if isinstance(raw, dict)]
+    if extra_headers is None or cached is not None:
+        PAGE_CACHE.store(url, api_key, batch, headers)
+    return batch, headers
+
+
+def fetch_page_items(url: str, api_key: str) -> list[dict[str, Any]]:
+    batch, _ = fetch_page(url, api_key)
+    return batch or []
+
+
+def remaining_page_offsets(first_count: int, headers: dict[str, str], page_size: int) -> list[int] | None:
+    """Plan every remaining `start` offset from the first page's Total-Results header."""
+    total = parse_nonnegative_int(headers.get("total-results"))
+    if total is None:
+        return None
+    if first_count < page_size:
+        return []
+    return list(range(first_count, total, page_size))
 
-        for raw in batch:
-            if isinstance(raw, dict):
-                results.append(raw)
 
+def fetch_remaining_sequential(url_builder: Any, api_key: str, start: int, page_size: int) -> list[dict[str, Any]]:
+    # Fallback when the server does not report Total-Results.
+    results: list[dict[str, Any]] = []
+    while True:
+        batch, _ = fetch_page(url_builder(start, page_size), api_key)
+        if not batch:
+            break
+        results.extend(batch)
         if len(batch) < page_size:
             break
-
         start += len(batch)
-        time.sleep(0.25)
-
     return results
 
 
-def write_json(path: Path, payload: dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=4, ensure_ascii=False)
-        f.write("\n")
+def fetch_paginated_versioned(
+    url_builder: Any,
+    api_key: str,
+    page_size: int = 100,
+    if_modified_since: int | None = None,
+    pool: ThreadPoolExecutor | None = None,
+) -> tuple[list[dict[str, Any]] | None, int | None]:
+    """
+    Fetch every page and return them with the library version reported by
+    the first page. With if_modified_since, returns (None, version) when the
+    library has not changed since that version.
+
+    Must be called from the thread that owns `pool`, never from one of its workers.
+    """
+    extra_headers = None
+    if if_modified_since is not None:
+        extra_headers = {"If-Modified-Since-Version": str(if_modified_since)}
+    first, headers = fetch_page(url_builder(0, page_size), api_key, extra_headers=extra_headers)
+    library_version = parse_nonnegative_int(headers.get("last-modified-version"))
+    if first is None:
+        return None, library_version if library_version is not None else if_modified_since
+
+    results = list(first)
+    offsets = remaining_page_offsets(len(first), headers, page_size)
+    if offsets is None:
+        if len(first) == page_size:
+            results.extend(fetch_remaining_sequential(url_builder, api_key, len(first), page_size))
+    elif pool is None:
+        for start in offsets:
+            batch, _ = fetch_page(url_builder(start, page_size), api_key)
+            results.extend(batch or [])
+    else:
+        futures = [pool.submit(fetch_page_items, url_builder(start, page_size), api_key) for start in offsets]
+        for future in futures:
+            results.extend(future.result())
+
+    return results, library_version
+
+
+def iter_paginated(
+    url_builder: Any,
+    api_key: str,
+    pool: ThreadPoolExecutor,
+    page_size: int = 100,
+    window: int = 8,
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Yield pages in order as they arrive, with at most `window` page requests
+    in flight ahead of the consumer, so a large result set is never held in
+    memory at once.
+
+    Must be called from the thread that owns `pool`, never from one of its workers.
+    """
+    first, headers = fetch_page(url_builder(0, page_size), api_key)
+    batch = first or []
+    yield batch
+    offsets = remaining_page_offsets(len(batch), headers, page_size)
+    if offsets is None:
+        start = len(batch)
+        while len(batch) == page_size:
+            batch = fetch_page_items(url_builder(start, page_size), api_key)
+            if not batch:
+                break
+            yield batch
+            start += len(batch)
+        return
+
+    remaining = iter(offsets)
+    pending = deque(pool.submit(fetch_page_items, url_builder(start, page_size), api_key) for start in islice(remaining, window))
+    while pending:
+        batch = pending.popleft().result()
+        start = next(remaining, None)
+        if start is not None:
+            pending.append(pool.submit(fetch_page_items, url_builder(start, page_size), api_key))
+        yield batch
+
+
+def iter_collections_items(
+    group_id: str,
+    collection_keys: list[str],
+    style: str,
+    api_key: str,
+    pool: ThreadPoolExecutor,
+    page_size: int = 100,
+    window: int = 8,
+) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+    """
+    Yield (collection key, top-level items) in input order.
+
+    First pages are requested up to `window` collections ahead of the
+    consumer; as each one reports Total-Results, the rest of that collection's
+    pages are dispatched to the same pool, so wall time follows the total page
+    count while memory holds at most `window` collections.
+    """
+
+    def url_builder(key: str) -> Any:
+        return lambda start, limit: build_collection_items_url(
+            group_id=group_id,
+            collection_key=key,
+            style=style,
+            start=start,
+            limit=limit,
+        )
+
+    def start_collection(key: str) -> Future[tuple[list[dict[str, Any]], list[Future[list[dict[str, Any]]]]]]:
+        planned: Future[tuple[list[dict[str, Any]], list[Future[list[dict[str, Any]]]]]] = Future()
+
+        def plan_rest(first: Future[tuple[list[dict[str, Any]] | None, dict[str, str]]]) -> None:
+            # Runs on the worker that fetched the first page; it only submits, never waits.
+            try:
+                batch, headers = first.result()
+                batch = batch or []
+                offsets = remaining_page_offsets(len(batch), headers, page_size)
+                if offsets is None:
+                    rest = [pool.submit(fetch_remaining_sequential, url_builder(key), api_key, page_size, page_size)] if len(batch) == page_size else []
+                else:
+                    rest = [pool.submit(fetch_page_items, url_builder(key)(start, page_size), api_key) for start in offsets]
+                planned.set_result((batch, rest))
+            except BaseException as exc:
+                planned.set_exception(exc)
+
+        pool.submit(fetch_page, url_builder(key)(0, page_size), api_key).add_done_callback(plan_rest)
+        return planned
+
+    remaining = iter(collection_keys)
+    pending = deque((key, start_collection(key)) for key in islice(remaining, window))
+    done = pages = 0
+    while pending:
+        key, planned = pending.popleft()
+        batch, rest = planned.result()
+        items = list(batch)
+        for future in rest:
+            items.extend(future.result())
+        next_key = next(remaining, None)
+        if next_key is not None:
+            pending.append((next_key, start_collection(next_key)))
+        done += 1
+        pages += 1 + len(rest)
+        print(f"[{done}/{len(collection_keys)} collections, {pages} pages] collection {key}: {len(items)} items", file=sys.stderr)
+        yield key, items
+
+
+def parse_concurrency(value: str | None) -> int:
+    try:
+        concurrency = int(str(value or "").strip())
+    except ValueError:
+        return DEFAULT_CONCURRENCY
+    return min(max(concurrency, 1), MAX_CONCURRENCY)
+
+
+class ItemSpool:
+    """
+    Compact items spooled to an anonymous temp file as JSON lines, stored once
+    per key, with only keys, file offsets and per-collection key lists kept in
+    memory. Lets the snapshot be assembled and written in one streaming pass.
+
+    Bib HTML is split off on the way in and stored once per distinct string,
+    keyed by its hash; spooled items carry only the bibHash reference.
+    """
+
+    def __init__(self, collection_keys: Iterable[str]) -> None:
+        self._file = tempfile.TemporaryFile()
+        self._offsets: dict[str, int] = {}
+        self._bib_offsets: dict[str, int] = {}
+        self.bib_refs: dict[str, str] = {}
+        self.dois: dict[str, str] = {}
+        self.collection_refs: dict[str, list[str]] = {key: [] for key in collection_keys}
+
+    def __enter__(self) -> "ItemSpool":
+        return self
 
+    def __exit__(self, *_: Any) -> None:
+        self._file.close()
 
-def main() -> int:
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._offsets
+
+    def _append(self, value: Any) -> int:
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(json.dumps(value, ensure_ascii=False).encode("utf-8") + b"\n")
+        return offset
+
+    def _read(self, offset: int) -> Any:
+        self._file.seek(offset)
+        return json.loads(self._file.readline())
+
+    def add(self, collection_key: str, item: dict[str, Any]) -> None:
+        key = str(item.get("key") or "")
+        if not key:
+            return
+        if key not in self._offsets:
+            data = item.get("data") if isinstance(item.get("data"), dict) else {}
+            doi = normalize_doi(data.get("DOI") or data.get("doi"))
+            if doi:
+                self.dois[key] = doi
+            item, html = split_bib(item)
+            if html is not None:
+                self.bib_refs[key] = item["bibHash"]
+                if item["bibHash"] not in self._bib_offsets:
+                    self._bib_offsets[item["bibHash"]] = self._append(html)
+            self._offsets[key] = self._append(item)
+        self.collection_refs.setdefault(collection_key, []).append(key)
+
+    def get(self, key: str) -> dict[str, Any]:
+        return self._read(self._offsets[key])
+
+    def get_bib(self, digest: str) -> str:
+        return self._read(self._bib_offsets[digest])
+
+    def bibliography_for(self, items: Iterable[dict[str, Any]]) -> dict[str, str]:
+        digests = {item["bibHash"] for item in items if isinstance(item.get("bibHash"), str)}
+        return {digest: self.get_bib(digest) for digest in sorted(digests)}
+
+    def iter_bibliography(self) -> Iterator[tuple[str, str]]:
+        # Sorted so the table does not depend on the order items arrived in.
+        for digest in sorted(self._bib_offsets):
+            yield digest, self.get_bib(digest)
+
+    def items_for(self, collection_key: str) -> list[dict[str, Any]]:
+        return [self.get(key) for key in self.collection_refs.get(collection_key, [])]
+
+    def iter_items(self) -> Iterator[dict[str, Any]]:
+        """Each item once, in collection order, as the old in-memory items list was built."""
+        seen: set[str] = set()
+        for refs in self.collection_refs.values():
+            for key in refs:
+                if key not in seen:
+                    seen.add(key)
+                    yield self.get(key)
+
+
+def build_collection_index(raw_collections: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    """Index all collections by parent key in one pass; siblings are sorted by name."""
+    children: dict[str, list[dict[str, Any]]] = {}
+    for raw in raw_collections:
+        data = raw.get("data") if isinstance(raw.get("data"), dict) else {}
+        if data.get("deleted"):
+            continue
+        if not raw.get("key"):
+            continue
+        parent = str(data.get("parentCollection") or "")
+        children.setdefault(parent, []).append(compact_collection(raw))
+
+    for siblings in children.values():
+        siblings.sort(key=lambda c: str(c.get("name") or "").lower())
+    return children
+
+
+def walk_collection_subtree(index: dict[str, list[dict[str, Any]]], root_key: str) -> list[dict[str, Any]]:
+    """All descendants of root_key, depth-first with parents before their children."""
+    ordered: list[dict[str, Any]] = []
+    seen: set[str] = {root_key}
+
+    def visit(parent_key: str) -> None:
+        for collection in index.get(parent_key, []):
+            key = str(collection.get("key") or "")
+            if key in seen:
+                continue
+            seen.add(key)
+            ordered.append(collection)
+            visit(key)
+
+    visit(root_key)
+    return ordered
+
+
+def build_collection_tree(
+    index: dict[str, list[dict[str, Any]]],
+    root_key: str,
+    collection_refs: dict[str, list[str]],
+) -> list[dict[str, Any]]:
+    """
+    Nested collection nodes below root_key. numItems counts the collection's own
+    top-level items; totalItems counts distinct items in its whole subtree.
+    """
+    seen: set[str] = {root_key}
+
+    def build(parent_key: str) -> tuple[list[dict[str, Any]], set[str]]:
+        nodes: list[dict[str, Any]] = []
+        subtree_keys: set[str] = set()
+        for collection in index.get(parent_key, []):
+            key = str(collection.get("key") or "")
+            if key in seen:
+                continue
+            seen.add(key)
+            own_keys = set(collection_refs.get(key, []))
+            children, child_keys = build(key)
+            total_keys = own_keys | child_keys
+            nodes.append(
+                {
+                    "key": key,
+                    "name": collection.get("name"),
+                    "numItems": len(own_keys),
+                    "totalItems": len(total_keys),
+                    "children": children,
+                }
+            )
+            subtree_keys |= total_keys
+        return nodes, subtree_keys
+
+    tree, _ = build(root_key)
+    return tree
+
+
+def previous_library_version(
+    previous: PreviousSnapshot, group_id: str, collection_key: str, style: str, styles: list[str]
+) -> int | None:
+    # Only trust the recorded version if the snapshot was built for the same
+    # library view; otherwise the bib HTML, collection set or the bib/ tables
+    # for the `styles` (the snapshot's own first) would be wrong.
+    if not previous:
+        return None
+    source = previous.meta.get("source") if isinstance(previous.meta.get("source"), dict) else {}
+    if str(source.get("group_id") or "") != group_id:
+        return None
+    if str(source.get("collection_key") or "") != collection_key:
+        return None
+    if str(source.get("style") or "") != style:
+        return None
+    if previous.meta.get("styles") != styles:
+        return None
+    return parse_nonnegative_int(previous.meta.get("library_version"))
+
+
+def assign_items_to_collections(
+    compact_items: list[dict[str, Any]],
+    collection_keys: list[str],
+) -> dict[str, list[dict[str, Any]]]:
+    """Build collection_items locally from each item's data.collections, keeping stream order."""
+    wanted = set(collection_keys)
+    collection_items: dict[str, list[dict[str, Any]]] = {key: [] for key in collection_keys}
+    for item in compact_items:
+        collections = item.get("data", {}).get("collections")
+        if not isinstance(collections, list):
+            continue
+        for key in dict.fromkeys(str(c) for c in collections):
+            if key in wanted:
+                collection_items[key].append(item)
+    return collection_items
+
+
+def merge_changed_items(
+    changed_items: list[dict[str, Any]],
+    previous_items: list[dict[str, Any]],
+    removed_keys: set[str],
+) -> list[dict[str, Any]]:
+    """
+    Apply an incremental change set to one collection's previous items.
+
+    Changed items go first, matching the API's default order (most recently
+    modified first); `removed_keys` covers both deleted and changed items.
+    """
+    kept = [item for item in previous_items if str(item.get("key") or "") not in removed_keys]
+    return changed_items + kept
+
+
+def is_truthy(value: str | None) -> bool:
+    return str(value or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def output_label(path: Path) -> str:
+    return path.relative_to(ROOT).as_posix() if path.is_relative_to(ROOT) else str(path)
+
+
+def write_json(path: Path, payload: dict[str, Any], release_sizes: list[tuple[str, dict[str, int]]] | None = None) -> None:
+    """Write readable JSON; with release_sizes, also write compact/precompressed siblings and record their sizes."""
+    # Unchanged files are left alone so their mtimes (and CDN caches) survive.
+    write_text_if_changed(path, json.dumps(payload, indent=4, ensure_ascii=False) + "\n")
+    if release_sizes is not None:
+        release_sizes.append((output_label(path), write_release_variants(path, payload)))
+
+
+def content_hash(payload: Any) -> str:
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def diff_items(before: list[dict[str, Any]], after: list[dict[str, Any]]) -> dict[str, int]:
+    """Added/removed/modified item counts between two versions of one collection."""
+    before_hashes = {str(item.get("key")): content_hash(item) for item in before}
+    after_hashes = {str(item.get("key")): content_hash(item) for item in after}
+    return {
+        "added": len(after_hashes.keys() - before_hashes.keys()),
+        "removed": len(before_hashes.keys() - after_hashes.keys()),
+        "modified": sum(1 for k in after_hashes.keys() & before_hashes.keys() if after_hashes[k] != before_hashes[k]),
+    }
+
+
+def write_style_bibliographies(
+    bib_dir: Path,
+    group_id: str,
+    styles: list[str],
+    spool: ItemSpool,
+    library_version: int | None,
+    api_key: str,
+    pool: ThreadPoolExecutor,
+    keep_style: str,
+    full_sync: bool = False,
+    window: int = 8,
+    release_sizes: list[tuple[str, dict[str, int]]] | None = None,
+) -> None:
+    """
+    Write bib/STYLE.json for each extra citation style: the snapshot's item
+    keys mapped to bib hashes, plus the hash -> HTML table.
+
+    Only bib HTML is requested (include=bib), never item data. A style file
+    from an earlier run is updated with just the items changed since the
+    library version it records. Files for styles no longer listed (other
+    than `keep_style`, the snapshot's own) are removed.
+    """
+    bib_dir.mkdir(parents=True, exist_ok=True)
+    for style in styles:
+        path = bib_dir / f"{style}.json"
+        previous = {} if full_sync else load_json_object(path)
+        since = parse_nonnegative_int(previous.get("library_version")) if previous.get("style") == style else None
+        item_hashes = dict(previous.get("items") or {}) if since is not None else {}
+        table = dict(previous.get("bibliography") or {}) if since is not None else {}
+
+        fetched = 0
+        if since is None or library_version is None or since < library_version:
+            for page in iter_paginated(
+                lambda start, limit: build_group_items_url(
+                    group_id=group_id, style=style, start=start, limit=limit, since=since, include="bib"
+                ),
+                api_key=api_key,
+                pool=pool,
+                window=window,
+            ):
+                for raw in page:
+                    key = str(raw.get("key") or "")
+                    if key in spool and isinstance(raw.get("bib"), str):
+                        digest = bib_hash(raw["bib"])
+                        item_hashes[key] = digest
+                        table[digest] = raw["bib"]
+                        fetched += 1
+
+        item_hashes = {key: item_hashes[key] for key in sorted(item_hashes) if key in spool}
+        bibliography = {digest: table[digest] for digest in sorted(set(item_hashes.values())) if digest in table}
+        # Like the snapshot, a file whose content is unchanged is kept even if
+        # the library version moved on; the next run just asks from the older one.
+        unchanged = previous.get("items") == item_hashes and previous.get("bibliography") == bibliography
+        if previous.get("style") == style and unchanged:
+            print(f"style {style}: {len(item_hashes)} items ({fetched} fetched, no changes)")
+            continue
+        payload = {
+            "style": style,
+            "library_version": library_version,
+            "items": item_hashes,
+            "bibliography": bibliography,
+        }
+        write_json(path, payload, release_sizes)
+        print(f"style {style}: {len(item_hashes)} items ({fetched} fetched)")
+
+    keep = set()
+    for style in styles + [keep_style]:
+        path = bib_dir / f"{style}.json"
+        min_path = compact_path(path)
+        keep.update({path.name, min_path.name, f"{min_path.name}.gz", f"{min_path.name}.br"})
+    for stale in bib_dir.iterdir():
+        if stale.name not in keep:
+            stale.unlink()
+
+
+def write_snapshot_json(
+    path: Path,
+    spool: ItemSpool,
+    header: dict[str, Any],
+    previous_hash: str,
+    updated_at: str,
+    release_sizes: list[tuple[str, dict[str, int]]] | None = None,
+) -> str | None:
+    """
+    Stream the single-file snapshot to `path` and return its content hash, or
+    None if the content matches `previous_hash` and the file was left alone.
+
+    Items are read back from the spool one at a time and the file is renamed
+    into place only once complete, so a crash never leaves it truncated. The
+    volatile fields go last because the hash is only known after the items.
+    """
+    with JsonObjectWriter(path, compact=release_sizes is not None) as writer:
+        for key, value in header.items():
+            writer.field(key, value, hashed=key not in VOLATILE_SNAPSHOT_FIELDS)
+        writer.array_field("items", spool.iter_items())
+        digest = writer.digest
+        if digest == previous_hash and path.exists():
+            writer.abort()
+            return None
+        writer.field("content_hash", digest, hashed=False)
+        writer.field("updated_at", updated_at, hashed=False)
+        writer.commit()
+
+    record_streamed_release(path, release_sizes)
+    return digest
+
+
+def record_streamed_release(path: Path, release_sizes: list[tuple[str, dict[str, int]]] | None) -> None:
+    # JsonObjectWriter(compact=True) already wrote the .min sibling; add the precompressed copies.
+    if release_sizes is None:
+        return
+    min_path = compact_path(path)
+    sizes = {"pretty": path.stat().st_size, "compact": min_path.stat().st_size}
+    sizes.update(write_compressed_siblings(min_path, min_path.read_bytes()))
+    release_sizes.append((output_label(path), sizes))
+
+
+def write_snapshot_bibliography(
+    path: Path,
+    style: str,
+    library_version: int | None,
+    spool: ItemSpool,
+    release_sizes: list[tuple[str, dict[str, int]]] | None = None,
+) -> None:
+    """Stream bib/STYLE.json for the snapshot's own style straight from the spool."""
+    with JsonObjectWriter(path, compact=release_sizes is not None) as writer:
+        writer.field("style", style)
+        writer.field("library_version", library_version)
+        writer.object_field("items", ((key, spool.bib_refs[key]) for key in sorted(spool.bib_refs)))
+        writer.object_field("bibliography", spool.iter_bibliography())
+        writer.commit()
+    record_streamed_release(path, release_sizes)
+
+
+def build_lookup_index(header: dict[str, Any], shards: list[dict[str, Any]], spool: ItemSpool) -> dict[str, Any]:
+    """
+    Map normalized DOIs to item keys and item keys to (shard key, position in
+    the shard's items), so a page can resolve a few citations by fetching
+    only the shards that hold them. Items in several collections point at
+    the first shard; duplicate DOIs resolve to the first item.
+    """
+    locations: dict[str, list[Any]] = {}
+    for shard in shards:
+        shard_key = str(shard.get("key") or "")
+        for offset, key in enumerate(spool.collection_refs.get(shard_key, [])):
+            locations.setdefault(key, [shard_key, offset])
+    doi_keys: dict[str, str] = {}
+    for key in locations:
+        if key in spool.dois:
+            doi_keys.setdefault(spool.dois[key], key)
+    return {
+        "content_hash": header.get("content_hash"),
+        "source": header.get("source"),
+        "styles": header.get("styles"),
+        "shards": {str(shard["key"]): {"path": shard["path"], "hash": shard["hash"]} for shard in shards},
+        "doi": dict(sorted(doi_keys.items())),
+        "items": dict(sorted(locations.items())),
+    }
+
+
+def write_snapshot_shards(
+    shard_dir: Path,
+    header: dict[str, Any],
+    collections: list[dict[str, Any]],
+    spool: ItemSpool,
+    previous: PreviousSnapshot,
+    release_sizes: list[tuple[str, dict[str, int]]] | None = None,
+) -> dict[str, dict[str, int]]:
+    """
+    Write one shard per collection plus a small manifest with counts and
+    content hashes, so pages can fetch only the shards they render and cache
+    unchanged ones by hash. Shards are built and compared with the previous
+    run one at a time; returns the per-collection change counts.
+
+    Also writes lookup.json (see build_lookup_index) next to the manifest.
+    """
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    shards: list[dict[str, Any]] = []
+    changes: dict[str, dict[str, int]] = {}
+    for collection in collections:
+        key = str(collection.get("key") or "")
+        items = spool.items_for(key)
+        shard = {
+            "key": key,
+            "name": collection.get("name"),
+            "items": items,
+            "bibliography": spool.bibliography_for(items),
+        }
+        # Read the previous shard before it is overwritten.
+        counts = diff_items([split_bib(item)[0] for item in previous.items(key)], items)
+        if any(counts.values()):
+            changes[key] = counts
+        write_json(shard_dir / f"{key}.json", shard, release_sizes)
+        shards.append(
+            {
+                "key": key,
+                "name": collection.get("name"),
+                "parentCollection": collection.get("parentCollection"),
+                "count": len(shard["items"]),
+                "hash": content_hash(shard),
+                "path": f"{key}.json",
+            }
+        )
+    current = {str(shard["key"]) for shard in shards}
+    for key in sorted(previous.collection_keys() - current):
+        changes[key] = diff_items(previous.items(key), [])
+
+    manifest = {
+        "updated_at": header.get("updated_at"),
+        "content_hash": header.get("content_hash"),
+        "library_version": header.get("library_version"),
+        "source": header.get("source"),
+        "styles": header.get("styles"),
+        "collections": header.get("collections"),
+        "collection_tree": header.get("collection_tree"),
+        "shards": shards,
+    }
+    write_json(shard_dir / MANIFEST_NAME, manifest, release_sizes)
+    write_json(shard_dir / LOOKUP_NAME, build_lookup_index(header, shards, spool), release_sizes)
+
+    keep = {MANIFEST_NAME, LOOKUP_NAME} | {str(shard["path"]) for shard in shards}
+    for stale in shard_dir.iterdir():
+        # Release siblings (KEY.min.json, .gz, .br) share the shard's stem;
+        # leftover temp files from an interrupted run start with a dot.
+        if stale.name.split(".", 1)[0] + ".json" not in keep or stale.name.startswith("."):
+            stale.unlink()
+    return changes
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Snapshot the Zotero library into zotero/; configured through ZOTERO_* environment variables."
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        default=os.environ.get("ZOTERO_METRICS_PATH") or None,
+        help="Write stage timings, request/byte counts and cache hits as JSON to PATH and print a summary (default: $ZOTERO_METRICS_PATH)",
+    )
+    args = parser.parse_args(argv)
+    with METRICS.recording("update_zotero.py", args.metrics):
+        return sync()
+
+
+def sync() -> int:
     try:
         defaults = parse_defaults_from_config(ZOTERO_CONFIG_PATH)
     except FileNotFoundError:
@@ -195,99 +1260,227 @@ def main() -> int:
         return 2
 
     api_key = (os.environ.get("ZOTERO_API_KEY") or "").strip()
+    concurrency = parse_concurrency(os.environ.get("ZOTERO_CONCURRENCY"))
+    # "group" pulls all top-level items in one stream instead of once per collection.
+    fetch_mode = (os.environ.get("ZOTERO_FETCH_MODE") or "collections").strip().lower()
+    # Release mode adds compact .min.json files with .gz/.br siblings for static hosting.
+    release = is_truthy(os.environ.get("ZOTERO_RELEASE"))
+    # Extra CSL styles to prebuild bib tables for, e.g. "chicago-author-date,mla".
+    extra_styles = [s.strip() for s in (os.environ.get("ZOTERO_EXTRA_STYLES") or "").split(",") if s.strip()]
+    invalid_styles = [s for s in extra_styles if not is_valid_style_id(s)]
+    if invalid_styles:
+        print(f"error: invalid ZOTERO_EXTRA_STYLES entries: {', '.join(invalid_styles)}", file=sys.stderr)
+        return 2
+    if fetch_mode not in FETCH_MODES:
+        print(f"error: invalid ZOTERO_FETCH_MODE {fetch_mode!r} (expected one of: {', '.join(sorted(FETCH_MODES))})", file=sys.stderr)
+        return 2
     output_path = Path(os.environ.get("ZOTERO_OUTPUT_PATH") or str(DEFAULT_OUTPUT_PATH))
     if not output_path.is_absolute():
         output_path = (ROOT / output_path).resolve()
 
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="zotero")
     try:
-        raw_collections = fetch_paginated(
-            lambda start, limit: build_collections_url(group_id=group_id, start=start, limit=limit),
-            api_key=api_key,
+        return update_snapshot(
+            pool,
+            group_id,
+            collection_key,
+            style,
+            api_key,
+            output_path,
+            fetch_mode,
+            release,
+            window=2 * concurrency,
+            extra_styles=extra_styles,
         )
-    except urllib.error.HTTPError as exc:
-        detail = ""
-        try:
-            detail = exc.read().decode("utf-8", errors="replace")
-        except Exception:
-            detail = ""
-        print(f"error: Zotero API error ({exc.code}) {detail}".strip(), file=sys.stderr)
-        return 1
-    except Exception as exc:
-        print(f"error: Zotero API request failed: {exc}", file=sys.stderr)
-        return 1
-
-    child_collections: list[dict[str, Any]] = []
-    for raw in raw_collections:
-        data = raw.get("data") if isinstance(raw.get("data"), dict) else {}
-        if data.get("deleted"):
-            continue
-        if str(data.get("parentCollection") or "") != collection_key:
-            continue
-        if not raw.get("key"):
-            continue
-        child_collections.append(compact_collection(raw))
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        PAGE_CACHE.prune()
+        if PAGE_CACHE.enabled:
+            stats = PAGE_CACHE.stats
+            for name, value in stats.items():
+                METRICS.count(f"page_cache_{name}", value)
+            print(
+                f"page cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+                f"{stats['stored']} stored, {stats['evicted']} evicted",
+                file=sys.stderr,
+            )
 
-    child_collections.sort(key=lambda c: str(c.get("name") or "").lower())
 
-    collection_items: dict[str, list[dict[str, Any]]] = {}
-    items_by_key: dict[str, dict[str, Any]] = {}
+def update_snapshot(
+    pool: ThreadPoolExecutor,
+    group_id: str,
+    collection_key: str,
+    style: str,
+    api_key: str,
+    output_path: Path,
+    fetch_mode: str = "collections",
+    release: bool = False,
+    window: int = 8,
+    extra_styles: list[str] | None = None,
+) -> int:
+    PAGE_CACHE.start_run()
+    previous = PreviousSnapshot(output_path)
+    since_version = None
+    full_sync = is_truthy(os.environ.get("ZOTERO_FULL_SYNC"))
+    styles = [s for s in dict.fromkeys(extra_styles or []) if s != style]
+    if not full_sync:
+        since_version = previous_library_version(previous, group_id, collection_key, style, [style] + styles)
 
     try:
-        for collection in child_collections:
-            child_key = str(collection.get("key") or "").strip()
-            if not child_key:
-                continue
-
-            raw_items = fetch_paginated(
-                lambda start, limit, key=child_key: build_collection_items_url(
-                    group_id=group_id,
-                    collection_key=key,
-                    style=style,
-                    start=start,
-                    limit=limit,
-                ),
+        # With a known library version this is the only request on a no-change run.
+        with METRICS.stage("collections"):
+            raw_collections, library_version = fetch_paginated_versioned(
+                lambda start, limit: build_collections_url(group_id=group_id, start=start, limit=limit),
                 api_key=api_key,
+                if_modified_since=since_version,
+                pool=pool,
             )
-
-            compact_items = []
-            for raw in raw_items:
-                if not raw.get("key"):
-                    continue
-                item = compact_item(raw)
-                compact_items.append(item)
-                items_by_key[str(raw.get("key"))] = item
-
-            collection_items[child_key] = compact_items
-    except urllib.error.HTTPError as exc:
-        detail = ""
-        try:
-            detail = exc.read().decode("utf-8", errors="replace")
-        except Exception:
-            detail = ""
-        print(f"error: Zotero API error ({exc.code}) {detail}".strip(), file=sys.stderr)
+    except ZoteroApiError as exc:
+        print(f"error: Zotero API error ({exc.code}) {exc.detail}".strip(), file=sys.stderr)
         return 1
     except Exception as exc:
         print(f"error: Zotero API request failed: {exc}", file=sys.stderr)
         return 1
 
-    items = list(items_by_key.values())
+    if raw_collections is None:
+        print(f"no changes since library version {since_version}; kept {output_path}")
+        return 0
+    # Cached pages fetched at this version can now be reused without a request.
+    PAGE_CACHE.library_version = library_version
 
-    payload: dict[str, Any] = {
-        "updated_at": utc_now_iso(),
-        "source": {
-            "group_id": group_id,
-            "collection_key": collection_key,
-            "style": style,
-            "endpoint": "https://api.zotero.org/groups/{group_id}/collections/{collection_key}/items/top",
-            "collections_endpoint": "https://api.zotero.org/groups/{group_id}/collections",
-        },
-        "collections": child_collections,
-        "collection_items": collection_items,
-        "items": items,
-    }
+    collection_index = build_collection_index(raw_collections)
+    child_collections = list(collection_index.get(collection_key, []))
+    # Items are snapshotted for the whole subtree, not only the direct children.
+    subtree_collections = walk_collection_subtree(collection_index, collection_key)
+    subtree_keys = [str(c.get("key") or "").strip() for c in subtree_collections if str(c.get("key") or "").strip()]
+
+    incremental = since_version is not None and set(subtree_keys) == previous.collection_keys()
+
+    with ItemSpool(subtree_keys) as spool:
+        try:
+            with METRICS.stage("items"):
+                if incremental:
+                    deleted = fetch_json(build_deleted_url(group_id=group_id, since=since_version), api_key=api_key)
+                    deleted_items = deleted.get("items") if isinstance(deleted, dict) else None
+                    deleted_keys = {str(k) for k in deleted_items} if isinstance(deleted_items, list) else set()
 
-    write_json(output_path, payload)
-    print(f"wrote {output_path} ({len(items)} items across {len(child_collections)} collections)")
+                    removed_keys = set(deleted_keys)
+                    changed_items: list[dict[str, Any]] = []
+                    for page in iter_paginated(
+                        lambda start, limit: build_group_items_url(
+                            group_id=group_id,
+                            style=style,
+                            start=start,
+                            limit=limit,
+                            since=since_version,
+                        ),
+                        api_key=api_key,
+                        pool=pool,
+                        window=window,
+                    ):
+                        for raw in page:
+                            key = str(raw.get("key") or "")
+                            if not key:
+                                continue
+                            removed_keys.add(key)
+                            data = raw.get("data") if isinstance(raw.get("data"), dict) else {}
+                            if not data.get("deleted"):
+                                changed_items.append(compact_item(raw))
+
+                    changed_by_collection = assign_items_to_collections(changed_items, subtree_keys)
+                    for subtree_key in subtree_keys:
+                        merged = merge_changed_items(changed_by_collection[subtree_key], previous.items(subtree_key), removed_keys)
+                        for item in merged:
+                            spool.add(subtree_key, item)
+                    print(
+                        f"incremental sync from library version {since_version}: "
+                        f"{len(changed_items)} changed, {len(deleted_keys)} deleted"
+                    )
+                elif fetch_mode == "group":
+                    wanted = set(subtree_keys)
+                    for page in iter_paginated(
+                        lambda start, limit: build_group_items_url(group_id=group_id, style=style, start=start, limit=limit),
+                        api_key=api_key,
+                        pool=pool,
+                        window=window,
+                    ):
+                        for raw in page:
+                            if not raw.get("key"):
+                                continue
+                            item = compact_item(raw)
+                            collections = item["data"].get("collections")
+                            for key in dict.fromkeys(str(c) for c in collections) if isinstance(collections, list) else []:
+                                if key in wanted:
+                                    spool.add(key, item)
+                else:
+                    for subtree_key, raw_items in iter_collections_items(
+                        group_id, subtree_keys, style, api_key, pool, window=window
+                    ):
+                        for raw in raw_items:
+                            if raw.get("key"):
+                                spool.add(subtree_key, compact_item(raw))
+
+            release_sizes = [] if release else None
+            bib_dir = output_path.parent / BIB_DIRNAME
+            with METRICS.stage("bibliographies"):
+                write_style_bibliographies(
+                    bib_dir, group_id, styles, spool, library_version, api_key, pool, style, full_sync, window, release_sizes
+                )
+        except ZoteroApiError as exc:
+            print(f"error: Zotero API error ({exc.code}) {exc.detail}".strip(), file=sys.stderr)
+            return 1
+        except Exception as exc:
+            print(f"error: Zotero API request failed: {exc}", file=sys.stderr)
+            return 1
+
+        header: dict[str, Any] = {
+            "source": {
+                "group_id": group_id,
+                "collection_key": collection_key,
+                "style": style,
+                "endpoint": "https://api.zotero.org/groups/{group_id}/collections/{collection_key}/items/top",
+                "collections_endpoint": "https://api.zotero.org/groups/{group_id}/collections",
+            },
+            "library_version": library_version,
+            # Items reference bib HTML by bibHash; each style's table is in bib/STYLE.json.
+            "styles": [style] + styles,
+            "collections": child_collections,
+            "collection_tree": build_collection_tree(collection_index, collection_key, spool.collection_refs),
+            # Key references into "items"; the full objects are stored only once.
+            "collection_items": spool.collection_refs,
+        }
+
+        updated_at = utc_now_iso()
+        with METRICS.stage("serialization"):
+            digest = write_snapshot_json(output_path, spool, header, previous.content_hash, updated_at, release_sizes)
+            bib_path = bib_dir / f"{style}.json"
+            # bibHash references make the content hash cover the bib table too.
+            if digest is not None or not bib_path.exists():
+                write_snapshot_bibliography(bib_path, style, library_version, spool, release_sizes)
+            if digest is None:
+                lookup_path = output_path.parent / SHARDS_DIRNAME / LOOKUP_NAME
+                if not lookup_path.exists() and isinstance(previous.meta.get("shards"), list):
+                    header.update(content_hash=previous.content_hash)
+                    write_json(lookup_path, build_lookup_index(header, previous.meta["shards"], spool), release_sizes)
+        if digest is None:
+            print(f"no content changes (hash {previous.content_hash}); kept {output_path}")
+            return 0
+
+        header["content_hash"] = digest
+        header["updated_at"] = updated_at
+        with METRICS.stage("shards"):
+            changes = write_snapshot_shards(
+                output_path.parent / SHARDS_DIRNAME, header, subtree_collections, spool, previous, release_sizes
+            )
+        names = {str(c.get("key")): str(c.get("name") or "") for c in subtree_collections}
+        for key, counts in changes.items():
+            print(
+                f"{names.get(key) or key} ({key}): "
+                f"+{counts['added']} added, -{counts['removed']} removed, ~{counts['modified']} modified"
+            )
+        if release_sizes:
+            print(format_size_report(release_sizes))
+        print(f"wrote {output_path} ({len(spool)} items across {len(subtree_keys)} collections)")
     return 0
 
 
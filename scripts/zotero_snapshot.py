@@ -0,0 +1,142 @@
+"""
+Reading the Zotero snapshot update_zotero.py writes under zotero/.
+
+Items are stored once in the snapshot and referenced by key from each
+collection; their bib HTML is split off into per-style tables and
+referenced by bibHash. The snapshot is also split into per-collection shards
+with a manifest. PreviousSnapshot reads either layout back, lazily, with bib
+HTML joined back in, for the updater's incremental sync and for
+generate_notebook_index.py's references. Stdlib-only and free of network
+code, so importing it has no side effects.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+
+# Per-collection shards and their manifest live next to the output file.
+SHARDS_DIRNAME = "shards"
+BIB_DIRNAME = "bib"
+MANIFEST_NAME = "manifest.json"
+LOOKUP_NAME = "lookup.json"
+STYLE_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def is_valid_style_id(value: str) -> bool:
+    # Extra styles name files under zotero/bib/, so only plain CSL ids are accepted.
+    return bool(STYLE_ID_RE.match(value))
+
+
+def bib_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()[:16]
+
+
+def split_bib(item: dict[str, Any]) -> tuple[dict[str, Any], str | None]:
+    """Swap an item's inline bib HTML for a bibHash reference; return the item and the HTML."""
+    html = item.get("bib")
+    if not isinstance(html, str):
+        return item, None
+    digest = bib_hash(html)
+    return {("bibHash" if k == "bib" else k): (digest if k == "bib" else v) for k, v in item.items()}, html
+
+
+def join_bib(item: dict[str, Any], bibliography: dict[str, Any]) -> dict[str, Any]:
+    """Inverse of split_bib, given the bibliography table the item's bibHash points into."""
+    html = bibliography.get(item.get("bibHash")) if isinstance(item.get("bibHash"), str) else None
+    if not isinstance(html, str):
+        return item
+    return {("bib" if k == "bibHash" else k): (html if k == "bibHash" else v) for k, v in item.items()}
+
+
+def load_json_object(path: Path) -> dict[str, Any]:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def resolve_collection_items(
+    snapshot: dict[str, Any],
+    bibliography: dict[str, Any] | None = None,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    Return collection_items as item dicts, accepting both key references and
+    inline items. Given the snapshot style's bibliography table, bibHash
+    references are swapped back for inline bib HTML.
+    """
+    raw = snapshot.get("collection_items")
+    if not isinstance(raw, dict):
+        return {}
+    bibliography = bibliography or {}
+    items_by_key = {
+        str(item.get("key")): join_bib(item, bibliography)
+        for item in snapshot.get("items") or []
+        if isinstance(item, dict) and item.get("key")
+    }
+    resolved: dict[str, list[dict[str, Any]]] = {}
+    for key, entries in raw.items():
+        items = []
+        for entry in entries if isinstance(entries, list) else []:
+            item = items_by_key.get(entry) if isinstance(entry, str) else entry
+            if isinstance(item, dict):
+                items.append(item)
+        resolved[str(key)] = items
+    return resolved
+
+
+class PreviousSnapshot:
+    """
+    The last written snapshot, read lazily: metadata comes from the shard
+    manifest and items are loaded one collection shard at a time. Snapshots
+    written before shards existed are read from the single file instead.
+    """
+
+    def __init__(self, output_path: Path) -> None:
+        shard_dir = output_path.parent / SHARDS_DIRNAME
+        self.meta: dict[str, Any] = {}
+        self._shard_paths: dict[str, Path] = {}
+        self._inline: dict[str, list[dict[str, Any]]] | None = None
+
+        manifest = load_json_object(shard_dir / MANIFEST_NAME)
+        if isinstance(manifest.get("shards"), list):
+            self.meta = manifest
+            for shard in manifest["shards"]:
+                if isinstance(shard, dict) and shard.get("key"):
+                    key = str(shard["key"])
+                    self._shard_paths[key] = shard_dir / Path(str(shard.get("path") or f"{key}.json")).name
+            return
+
+        snapshot = load_json_object(output_path)
+        if isinstance(snapshot.get("collection_items"), dict):
+            self.meta = snapshot
+            source = snapshot.get("source") if isinstance(snapshot.get("source"), dict) else {}
+            style = str(source.get("style") or "")
+            bib_table = load_json_object(output_path.parent / BIB_DIRNAME / f"{style}.json") if is_valid_style_id(style) else {}
+            bibliography = bib_table.get("bibliography") if isinstance(bib_table.get("bibliography"), dict) else {}
+            self._inline = resolve_collection_items(snapshot, bibliography)
+
+    def __bool__(self) -> bool:
+        return bool(self.meta)
+
+    @property
+    def content_hash(self) -> str:
+        return str(self.meta.get("content_hash") or "")
+
+    def collection_keys(self) -> set[str]:
+        return set(self._inline if self._inline is not None else self._shard_paths)
+
+    def items(self, collection_key: str) -> list[dict[str, Any]]:
+        """The collection's previous items, with bib HTML inline as the API returns it."""
+        if self._inline is not None:
+            return self._inline.get(collection_key, [])
+        path = self._shard_paths.get(collection_key)
+        shard = load_json_object(path) if path else {}
+        items = shard.get("items")
+        bibliography = shard.get("bibliography") if isinstance(shard.get("bibliography"), dict) else {}
+        return [join_bib(item, bibliography) for item in items if isinstance(item, dict)] if isinstance(items, list) else []